@@ -0,0 +1,54 @@
+"""
+Parse time of a synthetic Ziroom-style listing page (600 h5.title.sign
+entries, about 300 KB) with each installed tree builder, with and without
+the SoupStrainer the ziroom module uses.
+
+    python3 benchmarks/parse_backends.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from core.parse import BeautifulSoup, SoupStrainer
+
+ROUNDS = 5
+
+
+def listing_page(count=600):
+    items = []
+    for i in range(count):
+        items.append(
+            f'<div class="item"><div class="pic-box"><img src="//img.ziroom.com/pic/{i}.jpg" alt=""></div>'
+            f'<div class="info-box"><h5 class="title sign"><a href="//www.ziroom.com/x/{807442510 + i}.html" target="_blank">'
+            f'整租·某某小区{i}号院 2居室-南</a></h5><div class="desc"><div>{20 + i % 40}㎡ | {i % 20}/20层</div>'
+            f'<div class="location">距地铁站{300 + i}米</div></div><div class="tag"><span>离地铁近</span><span>独立阳台</span></div>'
+            f'<div class="price"><span class="num">{4000 + i}</span><span class="unit">/月</span></div></div></div>\n'
+        )
+    return '<html><head><title>自如</title></head><body><div class="Z_list-box">' + ''.join(items) + '</div></body></html>'
+
+
+def bench(html, parser, only=None):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        soup = BeautifulSoup(html, parser, parse_only=only) if only else BeautifulSoup(html, parser)
+        found = soup.find_all('h5', attrs={'class': 'title sign'})
+    return (time.perf_counter() - start) / ROUNDS * 1000, len(found)
+
+
+def main():
+    html = listing_page()
+    print(f"page: {len(html.encode('utf-8')) / 1024:.0f} KB")
+    strainer = SoupStrainer('h5', attrs={'class': 'title sign'})
+    for parser in ('html.parser', 'lxml'):
+        try:
+            full, count = bench(html, parser)
+            strained, _ = bench(html, parser, strainer)
+        except Exception as e:
+            print(f"{parser:12} unavailable: {e}")
+            continue
+        print(f"{parser:12} full {full:7.1f} ms   strained {strained:7.1f} ms   ({count} titles)")
+
+
+if __name__ == '__main__':
+    main()
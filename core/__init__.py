@@ -0,0 +1 @@
+"""Shared helpers used by the scraper modules under modules/."""
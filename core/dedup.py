@@ -0,0 +1,108 @@
+import zlib
+import random
+from collections import Counter, defaultdict
+
+from core.match import words
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Largest prime below 2**32: with 32-bit shingle hashes, a * x + b of the
+# (a * x + b) mod p permutations stays within 64 bits
+_PRIME = 4294967291
+
+
+def shingles(text, size=2):
+    """Set of `size`-word shingles of text (the words themselves for shorter texts)"""
+    text_words = words(text)
+    if len(text_words) <= size:
+        return {' '.join(text_words)} if text_words else set()
+    return {' '.join(text_words[i:i + size]) for i in range(len(text_words) - size + 1)}
+
+
+def drop_boilerplate(shingle_sets, max_share=0.1, min_count=5):
+    """
+    Remove shingles found in more than `max_share` of the sets (and at least
+    `min_count` of them), e.g. a description every item of one source shares,
+    so they do not make unrelated items look alike
+    """
+    counts = Counter(s for shingle_set in shingle_sets for s in shingle_set)
+    limit = max(min_count, max_share * len(shingle_sets))
+    common = {s for s, count in counts.items() if count > limit}
+    if not common:
+        return shingle_sets
+    return [shingle_set - common for shingle_set in shingle_sets]
+
+
+class MinHasher:
+    """MinHash signatures of `num_perm` values; seeded, so stable between runs"""
+
+    def __init__(self, num_perm=64, seed=1):
+        rng = random.Random(seed)
+        self.a = [rng.randrange(1, _PRIME) for _ in range(num_perm)]
+        self.b = [rng.randrange(0, _PRIME) for _ in range(num_perm)]
+        if np is not None:
+            self._a = np.array(self.a, dtype=np.uint64)[:, None]
+            self._b = np.array(self.b, dtype=np.uint64)[:, None]
+
+    def signature(self, shingle_set):
+        hashes = [zlib.crc32(s.encode('utf-8')) % _PRIME for s in shingle_set]
+        if not hashes:
+            return (_PRIME,) * len(self.a)
+        if np is not None:
+            values = (self._a * np.array(hashes, dtype=np.uint64) + self._b) % np.uint64(_PRIME)
+            return tuple(values.min(axis=1).tolist())
+        return tuple(min((a * x + b) % _PRIME for x in hashes) for a, b in zip(self.a, self.b))
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def near_duplicate_clusters(texts, threshold=0.5, num_perm=64, bands=16):
+    """
+    Group texts whose word shingles have a Jaccard similarity of at least
+    `threshold`. MinHash signatures are cut into `bands` bands; only texts
+    that share a band bucket (LSH) are compared, so the cost stays close to
+    linear in the number of texts. Candidates are confirmed on the exact
+    shingle sets. Returns clusters as lists of indices, in input order;
+    unique texts come back as single-element clusters.
+    """
+    shingle_sets = drop_boilerplate([shingles(text) for text in texts])
+    hasher = MinHasher(num_perm)
+    rows = num_perm // bands
+
+    parent = list(range(len(texts)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    buckets = defaultdict(list)
+    for i, shingle_set in enumerate(shingle_sets):
+        if not shingle_set:
+            continue
+        signature = hasher.signature(shingle_set)
+        for band in range(bands):
+            buckets[band, signature[band * rows:(band + 1) * rows]].append(i)
+
+    checked = set()
+    for members in buckets.values():
+        for n, i in enumerate(members):
+            for j in members[n + 1:]:
+                if (i, j) in checked or find(i) == find(j):
+                    continue
+                checked.add((i, j))
+                if jaccard(shingle_sets[i], shingle_sets[j]) >= threshold:
+                    parent[find(j)] = find(i)
+
+    clusters = defaultdict(list)
+    for i in range(len(texts)):
+        clusters[find(i)].append(i)
+    return sorted(clusters.values())
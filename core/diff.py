@@ -0,0 +1,138 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+KEY_SEPARATOR = '\x1f'
+
+
+def _key_column(records, key):
+    if isinstance(key, str):
+        return [str(record.get(key)) for record in records]
+    return [KEY_SEPARATOR.join(str(record.get(name)) for name in key) for record in records]
+
+
+def _to_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def columns(records, key, fields, numeric=()):
+    """
+    Turn a list of record dicts into aligned columns: '_key' plus one column
+    per field. Numeric fields become float columns (NaN when missing or not a
+    number), the others are compared as strings.
+    """
+    table = {'_key': _key_column(records, key)}
+    for field in fields:
+        if field in numeric:
+            table[field] = [_to_number(record.get(field)) for record in records]
+        else:
+            table[field] = [record.get(field) for record in records]
+    return table
+
+
+def _as_arrays(table, numeric):
+    arrays = {name: np.asarray(column, dtype=float if name in numeric else object) for name, column in table.items()}
+    arrays['_key'] = np.asarray(table['_key'], dtype=str) if len(table['_key']) else np.empty(0, dtype=str)
+    return arrays
+
+
+def diff_records(previous, current, key, fields=(), numeric=()):
+    """
+    Compare two snapshots (lists of record dicts) matched on `key`, a field
+    name or a tuple of field names. Returns
+
+        {
+            'added':   indices into current,
+            'removed': indices into previous,
+            'changed': {field: (current indices, previous indices)},
+            'delta':   {field: current - previous}, numeric fields only,
+                       aligned with changed[field],
+        }
+
+    With NumPy installed the index sets are integer arrays computed with
+    vectorized operations over the columns, otherwise plain lists.
+    Formatting the result is left to the caller.
+    """
+    return diff_columns(columns(previous, key, fields, numeric), columns(current, key, fields, numeric), fields, numeric)
+
+
+def diff_columns(prev_cols, cur_cols, fields=(), numeric=()):
+    """
+    diff_records for callers that already hold their data as columns: dicts
+    with a '_key' column of strings and one list per field, numeric fields
+    as floats (NaN for no value). When both sides carry a '_digest' column
+    (see core.digest.record_digests), rows with equal digests are taken as
+    unchanged and their fields are not compared.
+    """
+    if np is not None:
+        return _diff_numpy(_as_arrays(prev_cols, numeric), _as_arrays(cur_cols, numeric), fields, numeric)
+    return _diff_python(prev_cols, cur_cols, fields, numeric)
+
+
+def _diff_numpy(prev_cols, cur_cols, fields, numeric):
+    n_prev = len(prev_cols['_key'])
+    all_keys = np.concatenate([prev_cols['_key'], cur_cols['_key']])
+    _, codes = np.unique(all_keys, return_inverse=True)
+    prev_codes, cur_codes = codes[:n_prev], codes[n_prev:]
+
+    # Row of every key in each snapshot, -1 when absent (last duplicate wins)
+    prev_row = np.full(len(all_keys), -1)
+    prev_row[prev_codes] = np.arange(n_prev)
+    cur_row = np.full(len(all_keys), -1)
+    cur_row[cur_codes] = np.arange(len(cur_codes))
+
+    match = prev_row[cur_codes]
+    added = np.flatnonzero(match < 0)
+    removed = np.flatnonzero(cur_row[prev_codes] < 0)
+    common_cur = np.flatnonzero(match >= 0)
+    common_prev = match[common_cur]
+    if '_digest' in cur_cols and '_digest' in prev_cols:
+        differs = cur_cols['_digest'][common_cur] != prev_cols['_digest'][common_prev]
+        common_cur, common_prev = common_cur[differs], common_prev[differs]
+
+    result = {'added': added, 'removed': removed, 'changed': {}, 'delta': {}}
+    for field in fields:
+        a = cur_cols[field][common_cur]
+        b = prev_cols[field][common_prev]
+        if field in numeric:
+            differs = ~((a == b) | (np.isnan(a) & np.isnan(b)))
+        else:
+            differs = a != b
+        differs = np.asarray(differs, dtype=bool)
+        result['changed'][field] = (common_cur[differs], common_prev[differs])
+        if field in numeric:
+            result['delta'][field] = a[differs] - b[differs]
+    return result
+
+
+def _same(a, b):
+    return a == b or (a != a and b != b)
+
+
+def _diff_python(prev_cols, cur_cols, fields, numeric):
+    prev_row = {k: i for i, k in enumerate(prev_cols['_key'])}
+    cur_row = {k: i for i, k in enumerate(cur_cols['_key'])}
+
+    added, common = [], []
+    for i, k in enumerate(cur_cols['_key']):
+        j = prev_row.get(k)
+        if j is None:
+            added.append(i)
+        else:
+            common.append((i, j))
+    removed = [j for j, k in enumerate(prev_cols['_key']) if k not in cur_row]
+    if '_digest' in cur_cols and '_digest' in prev_cols:
+        common = [(i, j) for i, j in common if cur_cols['_digest'][i] != prev_cols['_digest'][j]]
+
+    result = {'added': added, 'removed': removed, 'changed': {}, 'delta': {}}
+    for field in fields:
+        a, b = cur_cols[field], prev_cols[field]
+        pairs = [(i, j) for i, j in common if not _same(a[i], b[j])]
+        result['changed'][field] = ([i for i, _ in pairs], [j for _, j in pairs])
+        if field in numeric:
+            result['delta'][field] = [a[i] - b[j] for i, j in pairs]
+    return result
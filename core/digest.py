@@ -0,0 +1,52 @@
+import os
+import json
+import hashlib
+
+from core.snapshot import atomic_write
+
+DIGEST_EXCLUDE = ('timestamp',)
+
+
+def _normalize(value, exclude):
+    if isinstance(value, dict):
+        return {k: _normalize(v, exclude) for k, v in value.items() if k not in exclude}
+    if isinstance(value, list):
+        return [_normalize(v, exclude) for v in value]
+    return value
+
+
+def canonical_digest(payload, exclude=DIGEST_EXCLUDE):
+    """
+    SHA-256 of the payload serialized canonically (sorted keys, compact
+    separators) with the `exclude` keys dropped at every level, so runs
+    that only differ in their timestamps hash the same.
+    """
+    canonical = json.dumps(_normalize(payload, exclude), ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def record_digests(records, exclude=()):
+    """Short per-record digests, usable as the '_digest' column of core.diff"""
+    return [canonical_digest(record, exclude)[:16] for record in records]
+
+
+def digest_path(data_path):
+    """data.json -> data.sha256, kept next to the data it describes"""
+    return os.path.splitext(data_path)[0] + '.sha256'
+
+
+def read_digest(data_path):
+    try:
+        with open(digest_path(data_path), 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def write_digest(data_path, digest):
+    atomic_write(digest_path(data_path), digest + '\n')
+
+
+def is_unchanged(data_path, digest):
+    """True when the stored digest matches and the data file is still there"""
+    return os.path.exists(data_path) and read_digest(data_path) == digest
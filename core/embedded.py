@@ -0,0 +1,37 @@
+import json
+
+_DECODER = json.JSONDecoder()
+
+
+def json_after(raw, marker, encoding='utf-8'):
+    """
+    Decode the JSON object or array that follows `marker` in a page, without
+    building a DOM: e.g. marker 'id="__NEXT_DATA__"' for a Next.js data
+    script, or 'window.__APP_CONFIG__' for an inline assignment. `raw` may
+    be the response bytes (only the script holding the value is decoded)
+    or text. Returns None when the marker or a value after it is missing;
+    raises ValueError when the value is not valid JSON.
+    """
+    if isinstance(raw, bytes):
+        marker = marker.encode(encoding)
+        brackets, script_end = (b'{', b'['), b'</script'
+    else:
+        brackets, script_end = ('{', '['), '</script'
+
+    pos = raw.find(marker)
+    if pos < 0:
+        return None
+    pos += len(marker)
+    end = raw.find(script_end, pos)
+    if end < 0:
+        end = len(raw)
+    starts = [i for i in (raw.find(b, pos, end) for b in brackets) if i >= 0]
+    if not starts:
+        return None
+    start = min(starts)
+
+    text = raw[start:end]
+    if isinstance(text, bytes):
+        text = text.decode(encoding)
+    value, _ = _DECODER.raw_decode(text)
+    return value
@@ -0,0 +1,176 @@
+import os
+import json
+import struct
+import statistics
+from datetime import date, datetime, timedelta
+
+from core.snapshot import atomic_write
+
+# timestamp (epoch seconds), unit id, price (cents, -1 = delisted),
+# available_on (date ordinal, 0 = unknown), previous row of the same unit + 1 (0 = none)
+RECORD = struct.Struct('<IIiII')
+DELISTED = -1
+
+
+def _to_cents(price):
+    return int(round(float(price) * 100)) if price is not None else 0
+
+
+def _to_ordinal(value):
+    try:
+        return date.fromisoformat(str(value)[:10]).toordinal()
+    except (TypeError, ValueError):
+        return 0
+
+
+def _from_ordinal(value):
+    return date.fromordinal(value).isoformat() if value else None
+
+
+class PriceHistory:
+    """
+    Append-only unit price history kept as two files in `directory`:
+
+    - history.bin: fixed-width RECORD rows in time order. A row is only
+      appended when a unit appears, changes price / available_on, or is
+      delisted, so unchanged hourly runs cost nothing.
+    - history.json: the unit dictionary (unit_number, floor_plan), the row
+      count and the last row of every unit.
+
+    Every row points back to the previous row of its unit, which makes those
+    chains per-unit indexes: a unit's trajectory or its state at a given
+    time is read without scanning the rest of the file.
+    """
+
+    def __init__(self, directory):
+        self.data_path = os.path.join(directory, 'history.bin')
+        self.meta_path = os.path.join(directory, 'history.json')
+        self.units = []
+        self.heads = []
+        self.rows = 0
+        # Set when history.bin holds rows that history.json cannot account for
+        self.unreadable = None
+        try:
+            if os.path.exists(self.meta_path):
+                with open(self.meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                self.units = [tuple(unit) for unit in meta['units']]
+                self.heads = meta['heads']
+                self.rows = meta['rows']
+            size = os.path.getsize(self.data_path) if os.path.exists(self.data_path) else 0
+            if size < self.rows * RECORD.size:
+                raise ValueError(f"{self.data_path} is shorter than {self.rows} rows")
+            if not os.path.exists(self.meta_path) and size:
+                raise ValueError(f"{self.meta_path} is missing")
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Unreadable price history {self.meta_path}: {e}")
+            self.units, self.heads, self.rows = [], [], 0
+            if os.path.exists(self.data_path) and os.path.getsize(self.data_path):
+                self.unreadable = str(e)
+        self.unit_ids = {unit_number: i for i, (unit_number, _) in enumerate(self.units)}
+
+    def _read(self, f, row):
+        f.seek(row * RECORD.size)
+        return RECORD.unpack(f.read(RECORD.size))
+
+    def _chain(self, f, unit_id):
+        """Rows of one unit, newest first"""
+        pointer = self.heads[unit_id]
+        while pointer:
+            record = self._read(f, pointer - 1)
+            yield record
+            pointer = record[4]
+
+    def append(self, units, timestamp=None):
+        """
+        Record a snapshot of currently listed units (dicts with unit_number,
+        floor_plan, price, available_on). Returns the number of rows written.
+        Nothing is written while the history is unreadable: starting over
+        would truncate the existing history.bin.
+        """
+        if self.unreadable:
+            print(f"Not appending to {self.data_path}, its index is unreadable ({self.unreadable})")
+            return 0
+        ts = int((timestamp or datetime.now()).timestamp())
+        new_rows = []
+        listed = set()
+
+        mode = 'r+b' if os.path.exists(self.data_path) else 'w+b'
+        with open(self.data_path, mode) as f:
+            # Drop rows past the recorded count, left by an interrupted run
+            f.truncate(self.rows * RECORD.size)
+
+            def add(unit_id, price, available_on):
+                row = self.rows + len(new_rows)
+                new_rows.append(RECORD.pack(ts, unit_id, price, available_on, self.heads[unit_id]))
+                self.heads[unit_id] = row + 1
+
+            for unit in units:
+                unit_number = unit.get('unit_number')
+                if unit_number is None:
+                    continue
+                unit_id = self.unit_ids.get(unit_number)
+                if unit_id is None:
+                    unit_id = self.unit_ids[unit_number] = len(self.units)
+                    self.units.append((unit_number, unit.get('floor_plan')))
+                    self.heads.append(0)
+                listed.add(unit_id)
+
+                price, available_on = _to_cents(unit.get('price')), _to_ordinal(unit.get('available_on'))
+                head = self.heads[unit_id]
+                last = self._read(f, head - 1) if head and head <= self.rows else None
+                if last is None or last[2] != price or last[3] != available_on:
+                    add(unit_id, price, available_on)
+
+            for unit_id, head in enumerate(self.heads):
+                if unit_id in listed or not head or head > self.rows:
+                    continue
+                if self._read(f, head - 1)[2] != DELISTED:
+                    add(unit_id, DELISTED, 0)
+
+            f.seek(self.rows * RECORD.size)
+            f.write(b''.join(new_rows))
+
+        self.rows += len(new_rows)
+        # history.bin first, then the index naming its rows: a crash in between
+        # leaves extra rows that the next append drops
+        atomic_write(self.meta_path, json.dumps({'units': self.units, 'heads': self.heads, 'rows': self.rows}, ensure_ascii=False, separators=(',', ':')))
+        return len(new_rows)
+
+    def trajectory(self, unit_number):
+        """Price changes of one unit, oldest first; a delisting has price None"""
+        unit_id = self.unit_ids.get(unit_number)
+        if unit_id is None or not os.path.exists(self.data_path):
+            return []
+        with open(self.data_path, 'rb') as f:
+            records = list(self._chain(f, unit_id))
+        return [{
+            'timestamp': datetime.fromtimestamp(ts).isoformat(),
+            'price': price / 100 if price != DELISTED else None,
+            'available_on': _from_ordinal(available_on),
+        } for ts, _, price, available_on, _ in reversed(records)]
+
+    def median_price(self, floor_plan, days=90, now=None):
+        """
+        Median asking rent of a floor plan over the last `days`: every price a
+        unit of that plan was listed at during the window counts once.
+        """
+        end = now or datetime.now()
+        start = int((end - timedelta(days=days)).timestamp())
+        end = int(end.timestamp())
+        prices = []
+        if not os.path.exists(self.data_path):
+            return None
+        with open(self.data_path, 'rb') as f:
+            for unit_id, (_, plan) in enumerate(self.units):
+                if plan != floor_plan:
+                    continue
+                for ts, _, price, _, _ in self._chain(f, unit_id):
+                    if ts > end:
+                        continue
+                    if price != DELISTED and price > 0:
+                        prices.append(price / 100)
+                    # The row in force when the window opened is the last one needed
+                    if ts <= start:
+                        break
+        return statistics.median(prices) if prices else None
@@ -0,0 +1,259 @@
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, urlsplit, urlunsplit, parse_qsl, urlencode
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import brotli  # noqa: F401  (lets urllib3 decode "br" responses)
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+# (connect, read) in seconds, overridable from the environment
+DEFAULT_TIMEOUT = (
+    float(os.environ.get('HTTP_CONNECT_TIMEOUT', 10)),
+    float(os.environ.get('HTTP_READ_TIMEOUT', 30)),
+)
+DEFAULT_RETRIES = int(os.environ.get('HTTP_RETRIES', 3))
+DEFAULT_BACKOFF = float(os.environ.get('HTTP_BACKOFF', 0.5))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+DEFAULT_WORKERS = int(os.environ.get('HTTP_WORKERS', 8))
+
+_session = None
+_session_lock = threading.Lock()
+
+# Per-thread deadline (time.monotonic()) for fetch_all, see set_deadline
+_context = threading.local()
+
+
+def _time_left():
+    deadline = getattr(_context, 'deadline', None)
+    return None if deadline is None else deadline - time.monotonic()
+
+
+class DeadlineRetry(Retry):
+    """Retry that gives up, and sleeps no longer than, the thread's set_deadline"""
+
+    def is_exhausted(self):
+        left = _time_left()
+        return (left is not None and left <= 0) or super().is_exhausted()
+
+    def get_backoff_time(self):
+        backoff, left = super().get_backoff_time(), _time_left()
+        return backoff if left is None else max(0, min(backoff, left))
+
+    def get_retry_after(self, response):
+        retry_after, left = super().get_retry_after(response), _time_left()
+        return retry_after if retry_after is None or left is None else max(0, min(retry_after, left))
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout when the caller gives none"""
+
+    def __init__(self, *args, timeout=DEFAULT_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def create_session(timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, backoff_factor=DEFAULT_BACKOFF,
+                   pool_connections=10, pool_maxsize=max(10, DEFAULT_WORKERS)):
+    """
+    Build a keep-alive session:
+    - one connection pool per host (pool_connections hosts, pool_maxsize sockets each)
+    - gzip/brotli negotiation
+    - default timeout and retry with exponential backoff on idempotent requests
+    """
+    retry = DeadlineRetry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS']),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = TimeoutHTTPAdapter(
+        timeout=timeout,
+        max_retries=retry,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+    )
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+    return session
+
+
+def get_session():
+    """Return the process-wide shared session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def get(url, **kwargs):
+    """GET through the shared session (drop-in for requests.get)"""
+    return get_session().get(url, **kwargs)
+
+
+def normalize_url(url):
+    """
+    Canonical form of a URL for use as a key: lowercase scheme and host,
+    no default port, fragment, tracking (utm_*) parameters or trailing
+    slash, query parameters sorted
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').rstrip('.')
+    if parts.port and (scheme, parts.port) not in (('http', 80), ('https', 443)):
+        host = f'{host}:{parts.port}'
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not k.startswith('utm_'))
+    return urlunsplit((scheme, host, parts.path.rstrip('/'), urlencode(query), ''))
+
+
+class ValidatorCache:
+    """
+    On-disk ETag / Last-Modified store keyed by URL, kept next to a module's
+    output files so CI can restore it together with them.
+
+    Validators are only sent while `artifact` (the output built from the
+    cached response) exists, otherwise a 304 would leave nothing to show.
+    """
+
+    def __init__(self, path, artifact=None):
+        self.path = path
+        self.entries = {}
+        self.enabled = artifact is None or os.path.exists(artifact)
+        try:
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable HTTP cache {path}: {e}")
+
+    def headers_for(self, url):
+        entry = self.entries.get(url) if self.enabled else None
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def update(self, url, response):
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            self.entries[url] = {'etag': etag, 'last_modified': last_modified}
+        else:
+            self.entries.pop(url, None)
+
+    def save(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+
+
+def conditional_get(url, cache, headers=None, **kwargs):
+    """
+    GET with If-None-Match / If-Modified-Since from `cache`.
+    A 304 response means the previous output is still current.
+    """
+    request_headers = dict(headers or {})
+    request_headers.update(cache.headers_for(url))
+    res = get(url, headers=request_headers, **kwargs)
+    if res.status_code == 200:
+        cache.update(url, res)
+    return res
+
+
+class HostRateLimiter:
+    """Thread-safe limiter spacing requests to the same host at most `rate` per second"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def set_deadline(deadline):
+    """
+    Give requests made from this thread a time.monotonic() deadline (None
+    for none): past it they are not retried, and fetch_all calls skip their
+    queued urls. core.sources sets it to each source's deadline.
+    """
+    _context.deadline = deadline
+
+
+def _cap_timeout(timeout, limit):
+    if timeout is None:
+        timeout = DEFAULT_TIMEOUT
+    if isinstance(timeout, tuple):
+        return tuple(min(t, limit) for t in timeout)
+    return min(timeout, limit)
+
+
+def fetch_all(urls, max_workers=DEFAULT_WORKERS, rate_limiter=None, cache=None, deadline=None, **kwargs):
+    """
+    Fetch urls concurrently over the shared session.
+    Returns a list of (response, error) tuples in the same order as urls,
+    so a failing url never affects the others. With a ValidatorCache the
+    requests are conditional and may come back as 304.
+
+    Past `deadline` (time.monotonic(); defaults to the thread's
+    set_deadline) queued urls are not fetched and come back with a
+    TimeoutError, and running requests get no more than the time left and
+    are not retried, so the pool's workers finish soon after the deadline.
+    """
+    if deadline is None:
+        deadline = getattr(_context, 'deadline', None)
+
+    def fetch(url):
+        set_deadline(deadline)
+        if rate_limiter:
+            rate_limiter.wait(url)
+        request_kwargs = kwargs
+        if deadline is not None:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                return None, TimeoutError(f"Deadline passed before fetching {url}")
+            request_kwargs = dict(kwargs, timeout=_cap_timeout(kwargs.get('timeout'), left))
+        try:
+            if cache is not None:
+                return conditional_get(url, cache, **request_kwargs), None
+            return get(url, **request_kwargs), None
+        except Exception as e:
+            return None, e
+
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(fetch, urls))
@@ -0,0 +1,196 @@
+import re
+
+# One findall over the source: comments and whitespace match without a
+# group and come back empty, every other token as its text. Regex literals
+# are not recognized (they read as punctuation), which only matters when
+# one contains a quote or a bracket.
+_TOKEN = re.compile(r'''
+    \s+ | //[^\n]* | /\*.*?\*/
+  | ( "(?:[^"\\\n]|\\.)*" | '(?:[^'\\\n]|\\.)*' | `(?:[^`\\$]|\\.|\$(?!\{))*`
+    | 0[xX][0-9a-fA-F]+ | (?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?
+    | [A-Za-z_$][\w$]*
+    | . )
+''', re.S | re.X)
+
+_ESCAPE = re.compile(r'\\(?:u\{([0-9a-fA-F]+)\}|u([0-9a-fA-F]{4})|x([0-9a-fA-F]{2})|(\r\n|[\s\S]))')
+_SIMPLE_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v', '0': '\0', '\n': '', '\r\n': '', '\r': ''}
+_CONSTANTS = {'true': True, 'false': False, 'null': None, 'undefined': None, 'NaN': float('nan'), 'Infinity': float('inf')}
+_QUOTES = '"\'`'
+
+
+class NotLiteral(Exception):
+    """The code at this position is not a plain literal (call, variable, function...)"""
+
+
+def tokenize(js):
+    """Token texts of JavaScript source: strings (quotes included), numbers, names and punctuation"""
+    return [token for token in _TOKEN.findall(js) if token]
+
+
+def _is_name(token):
+    return token[0].isalpha() or token[0] in '_$'
+
+
+def _is_number(token):
+    return token[0].isdigit() or (token[0] == '.' and len(token) > 1)
+
+
+def _unescape(m):
+    code = m.group(1) or m.group(2) or m.group(3)
+    if code:
+        return chr(int(code, 16))
+    ch = m.group(4)
+    return _SIMPLE_ESCAPES.get(ch, ch)
+
+
+def _string(token):
+    body = _ESCAPE.sub(_unescape, token[1:-1]) if '\\' in token else token[1:-1]
+    # \uD83D\uDE00 style pairs come out as two surrogates; join them
+    return body.encode('utf-16', 'surrogatepass').decode('utf-16', 'replace')
+
+
+def _number(token):
+    if token[:2] in ('0x', '0X'):
+        return int(token, 16)
+    if any(c in token for c in '.eE'):
+        return float(token)
+    return int(token)
+
+
+def parse_value(tokens, i, lenient=False):
+    """
+    Parse the literal starting at tokens[i]; returns (value, index after it).
+    With `lenient`, object properties and array items that are not literals
+    (callbacks, variables) are kept as NotLiteral instances instead of
+    failing the whole value.
+    """
+    if i >= len(tokens):
+        raise NotLiteral('end of input')
+    token = tokens[i]
+    first = token[0]
+    if first in _QUOTES and len(token) > 1:
+        return _string(token), i + 1
+    if _is_number(token):
+        return _number(token), i + 1
+    if _is_name(token):
+        if token in _CONSTANTS:
+            return _CONSTANTS[token], i + 1
+        raise NotLiteral(token)
+    if token in ('-', '+') and i + 1 < len(tokens) and (_is_number(tokens[i + 1]) or tokens[i + 1] in ('Infinity', 'NaN')):
+        value, j = parse_value(tokens, i + 1)
+        return (-value if token == '-' else value), j
+    if token == '[':
+        return _array(tokens, i + 1, lenient)
+    if token == '{':
+        return _object(tokens, i + 1, lenient)
+    raise NotLiteral(token)
+
+
+def _item(tokens, i, close, lenient):
+    """Parse one array item / property value, then step over the ',' after it"""
+    try:
+        value, j = parse_value(tokens, i, lenient)
+        if j < len(tokens) and tokens[j] not in (',', close):
+            raise NotLiteral(tokens[j])
+    except NotLiteral as e:
+        if not lenient:
+            raise
+        value, j = e, _skip_argument(tokens, i)
+        if j < len(tokens) and tokens[j] not in (',', close):
+            raise
+    if j < len(tokens) and tokens[j] == ',':
+        j += 1
+    return value, j
+
+
+def _array(tokens, i, lenient):
+    items = []
+    while i < len(tokens):
+        if tokens[i] == ']':
+            return items, i + 1
+        if tokens[i] == ',':
+            # hole: [1, , 2]
+            items.append(None)
+            i += 1
+            continue
+        value, i = _item(tokens, i, ']', lenient)
+        items.append(value)
+    raise NotLiteral('unterminated array')
+
+
+def _object(tokens, i, lenient):
+    obj = {}
+    while i < len(tokens):
+        token = tokens[i]
+        if token == '}':
+            return obj, i + 1
+        if token[0] in _QUOTES and len(token) > 1:
+            key = _string(token)
+        elif _is_name(token) or _is_number(token):
+            key = token
+        else:
+            raise NotLiteral(token)
+        if i + 1 >= len(tokens) or tokens[i + 1] != ':':
+            # shorthand {a, b}, a method, or a block of code
+            raise NotLiteral(token)
+        obj[key], i = _item(tokens, i + 2, '}', lenient)
+    raise NotLiteral('unterminated object')
+
+
+def _skip_argument(tokens, i):
+    """Index of the ',' or closing bracket that ends the expression at tokens[i]"""
+    depth = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token in ('(', '[', '{'):
+            depth += 1
+        elif token in (')', ']', '}'):
+            if depth == 0:
+                return i
+            depth -= 1
+        elif token == ',' and depth == 0:
+            return i
+        i += 1
+    return i
+
+
+def literals(js, tokens=None):
+    """
+    Yield every outermost array / object literal in JavaScript source as
+    Python lists and dicts. Brackets that do not open a plain literal (a
+    function body, an object holding a callback...) are stepped into, so
+    literals nested in them are still found.
+    """
+    tokens = tokenize(js) if tokens is None else tokens
+    end = 0
+    for i in [i for i, token in enumerate(tokens) if token == '[' or token == '{']:
+        if i < end:
+            continue
+        try:
+            value, end = parse_value(tokens, i)
+        except NotLiteral:
+            continue
+        yield value
+
+
+def calls(js, names, tokens=None):
+    """
+    Yield (name, arguments) for each call to one of `names`, plain or as a
+    method ('post' matches $.post(...)). Arguments are parsed leniently:
+    whatever is not a literal comes back as a NotLiteral instance.
+    """
+    tokens = tokenize(js) if tokens is None else tokens
+    names = set(names)
+    for i in [i for i, token in enumerate(tokens[:-1]) if token in names]:
+        if tokens[i + 1] != '(':
+            continue
+        args = []
+        j = i + 2
+        while j < len(tokens) and tokens[j] != ')':
+            try:
+                value, j = _item(tokens, j, ')', lenient=True)
+            except NotLiteral:
+                # unbalanced source; give up on this call
+                break
+            args.append(value)
+        yield tokens[i], args
@@ -0,0 +1,55 @@
+try:
+    import ijson
+    from ijson.common import ObjectBuilder
+except ImportError:
+    ijson = None
+
+
+def _walk(obj, parts):
+    if not parts:
+        yield obj
+        return
+    head, rest = parts[0], parts[1:]
+    if head == 'item':
+        if isinstance(obj, list):
+            for value in obj:
+                yield from _walk(value, rest)
+    elif isinstance(obj, dict) and head in obj:
+        yield from _walk(obj[head], rest)
+
+
+def iter_records(response, prefixes):
+    """
+    Yield (prefix, obj) for every JSON value found at one of `prefixes`
+    (ijson-style dotted paths such as 'data.units.item') while the body of a
+    stream=True response is read, so only one record is held at a time.
+
+    Falls back to response.json() when ijson is not installed.
+    Malformed JSON raises ValueError in both cases.
+    """
+    if ijson is None:
+        payload = response.json()
+        for prefix in prefixes:
+            for obj in _walk(payload, prefix.split('.')):
+                yield prefix, obj
+        return
+
+    response.raw.decode_content = True
+    builder = None
+    current = None
+    try:
+        for prefix, event, value in ijson.parse(response.raw, use_float=True):
+            if builder is None:
+                if prefix in prefixes:
+                    if event in ('start_map', 'start_array'):
+                        builder, current = ObjectBuilder(), prefix
+                        builder.event(event, value)
+                    else:
+                        yield prefix, value
+                continue
+            builder.event(event, value)
+            if prefix == current and event in ('end_map', 'end_array'):
+                yield current, builder.value
+                builder = None
+    except ijson.JSONError as e:
+        raise ValueError(f"Invalid JSON: {e}") from e
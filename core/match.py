@@ -0,0 +1,153 @@
+import re
+import string
+from collections import deque
+from urllib.parse import urlparse
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton that finds every keyword occurring in a text in one pass"""
+
+    def __init__(self, keywords):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [frozenset()]
+        for keyword in keywords:
+            if keyword:
+                self._add(keyword)
+        self._build_failure_links()
+
+    def _add(self, keyword):
+        state = 0
+        for ch in keyword:
+            next_state = self.goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][ch] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(frozenset())
+            state = next_state
+        self.output[state] = self.output[state] | {keyword}
+
+    def _build_failure_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(ch, 0)
+                self.output[next_state] = self.output[next_state] | self.output[self.fail[next_state]]
+
+    def find(self, text):
+        """Return the set of keywords found in text"""
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        found = set()
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
+
+_WORD = re.compile(r'\w+')
+# ASCII punctuation to blanks, so str.split() gives the same words as _WORD
+_ASCII_WORDS = str.maketrans({ch: ' ' for ch in string.punctuation if ch != '_'})
+
+
+def words(text):
+    """Lowercased words (runs of letters, digits and underscores) of text"""
+    text = text.lower()
+    if text.isascii():
+        return text.translate(_ASCII_WORDS).split()
+    return _WORD.findall(text)
+
+
+_VOWELS = 'aeiou'
+
+
+def inflections(word):
+    """
+    The word and its plural forms (-s, -es, -y -> -ies). Other suffixes are
+    left out on purpose: 'grant' must not match "taken for granted", nor
+    'stack' "stacked". Forms that are not real words cost nothing, since
+    they only ever get looked up.
+    """
+    forms = {word, word + 's', word + 'es'}
+    if len(word) > 1 and word.endswith('y') and word[-2] not in _VOWELS:
+        # bounty -> bounties
+        forms.add(word[:-1] + 'ies')
+    return forms
+
+
+class KeywordClassifier:
+    """
+    Whole-word matcher for several named keyword lists. Each text is split
+    into words once; single-word keywords of every class are then found with
+    one set intersection and multi-word ones by a lookup in the re-joined
+    words, so the cost barely grows with the number of keywords. Keywords
+    also match their plurals (the last word of a phrase), computed up front:
+    'developer' matches 'developers' and 'bounty' 'bounties', while 'dev'
+    still does not match 'device', nor 'api' 'capital'.
+    """
+
+    def __init__(self, classes, inflect=True):
+        self.order = {}
+        self.found_as = {}
+        for name, keywords in classes.items():
+            self.order[name] = {}
+            for keyword in keywords:
+                phrase = ' '.join(words(keyword))
+                if not phrase:
+                    continue
+                self.order[name].setdefault(keyword, len(self.order[name]))
+                self.found_as.setdefault(phrase, []).append((name, keyword))
+        # every form a keyword may appear as -> the keyword phrase
+        self.forms = {}
+        for phrase in self.found_as:
+            head, _, last = phrase.rpartition(' ')
+            for form in (inflections(last) if inflect else {last}):
+                self.forms.setdefault(f'{head} {form}' if head else form, phrase)
+        # exact keywords win over another keyword's inflection
+        self.forms.update((phrase, phrase) for phrase in self.found_as)
+        self.singles = {form for form in self.forms if ' ' not in form}
+        # multi-word forms by first word, only looked at when that word occurs
+        self.phrases = {}
+        for form in self.forms:
+            if ' ' in form:
+                self.phrases.setdefault(form.split(' ', 1)[0], []).append(form)
+
+    def classify(self, text):
+        """Return {class: [keywords found]} in each class's keyword order"""
+        text_words = words(text)
+        word_set = set(text_words)
+        found = self.singles & word_set
+        heads = self.phrases.keys() & word_set
+        if heads:
+            joined = ' %s ' % ' '.join(text_words)
+            found.update(form for head in heads for form in self.phrases[head] if ' %s ' % form in joined)
+        result = {name: [] for name in self.order}
+        for phrase in {self.forms[form] for form in found}:
+            for name, keyword in self.found_as[phrase]:
+                result[name].append(keyword)
+        for name, keywords in result.items():
+            keywords.sort(key=self.order[name].get)
+        return result
+
+
+def host_matches(url, domains):
+    """
+    True when the URL's hostname is one of `domains` (a set) or a subdomain
+    of one, e.g. docs.github.com for github.com
+    """
+    host = (urlparse(url).hostname or '').rstrip('.')
+    while host:
+        if host in domains:
+            return True
+        _, _, host = host.partition('.')
+    return False
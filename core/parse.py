@@ -0,0 +1,34 @@
+import os
+from bs4 import BeautifulSoup, SoupStrainer  # noqa: F401  (re-exported for modules)
+
+# Fastest first; html.parser ships with Python so it is always available
+PARSER_PREFERENCE = ('lxml', 'html.parser')
+
+
+def _available_parser():
+    forced = os.environ.get('HTML_PARSER')
+    if forced:
+        return forced
+    for name in PARSER_PREFERENCE:
+        if name == 'html.parser':
+            return name
+        try:
+            __import__(name)
+            return name
+        except ImportError:
+            continue
+    return 'html.parser'
+
+
+PARSER = _available_parser()
+
+
+def make_soup(markup, only=None, **kwargs):
+    """
+    BeautifulSoup over the fastest installed tree builder (override with HTML_PARSER).
+    `only` is a SoupStrainer naming the elements a module needs; just those
+    subtrees are materialized, which keeps parse time and memory down on large pages.
+    """
+    if only is not None:
+        kwargs['parse_only'] = only
+    return BeautifulSoup(markup, PARSER, **kwargs)
@@ -0,0 +1,69 @@
+import os
+import json
+import tempfile
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_open(path, mode='w', opener=open, **kwargs):
+    """
+    Open a temporary file next to `path` and rename it over `path` when the
+    block exits cleanly, so readers and crashed runs only ever see the old
+    or the new file. `opener` may be e.g. gzip.open.
+    """
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    os.close(fd)
+    # mkstemp creates 0600 files; reports and data are published as-is
+    os.chmod(tmp_path, 0o644)
+    try:
+        with opener(tmp_path, mode, **kwargs) as f:
+            yield f
+        with open(tmp_path, 'rb+') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write(path, text):
+    """Replace `path` with `text` atomically"""
+    with atomic_open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+class SnapshotStore:
+    """
+    A module's JSON snapshot (data.json): read at most once per run, kept in
+    memory as the previous snapshot for diffing, and replaced atomically.
+    """
+
+    _UNLOADED = object()
+
+    def __init__(self, path):
+        self.path = path
+        self._previous = self._UNLOADED
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    @property
+    def previous(self):
+        """The snapshot on disk before this run, None if missing or unreadable"""
+        if self._previous is self._UNLOADED:
+            self._previous = None
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._previous = json.load(f)
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable snapshot {self.path}: {e}")
+        return self._previous
+
+    def save(self, data):
+        atomic_write(self.path, json.dumps(data, ensure_ascii=False, indent=2))
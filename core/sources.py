@@ -0,0 +1,68 @@
+import time
+import queue
+import threading
+
+from core import http
+
+DEFAULT_SOURCE_TIMEOUT = 60
+
+
+def _run_source(source, deadline, results_queue):
+    # http.fetch_all pools started by the source stop at its deadline; their
+    # worker threads are joined at interpreter exit, daemon or not
+    http.set_deadline(deadline)
+    limiter = source.get('rate_limiter')
+    if limiter:
+        limiter.wait(source['rate_url'])
+    try:
+        result = source['func'](*source.get('args', ()), **source.get('kwargs', {}))
+        results_queue.put((source['name'], result, None))
+    except Exception as e:
+        results_queue.put((source['name'], None, e))
+
+
+def run_sources(sources):
+    """
+    Run every source concurrently, each under its own deadline.
+
+    A source is a dict with 'name', 'func' and optional 'args', 'kwargs',
+    'timeout' (seconds) and 'rate_limiter' + 'rate_url' (a shared
+    http.HostRateLimiter budget the source waits on before starting).
+
+    Results are collected as sources finish and returned as {name: result}.
+    Sources that raise or miss their deadline are left out. They run in
+    daemon threads, and past a source's deadline its http requests are not
+    retried and its http.fetch_all calls skip queued URLs and cap request
+    timeouts at the deadline, so a late source holds up the exit only until
+    its running requests finish or time out. Other blocking calls (a single
+    slow http.get, a sleep) are not bounded.
+    """
+    results_queue = queue.Queue()
+    start = time.monotonic()
+    deadlines = {}
+    for source in sources:
+        deadlines[source['name']] = start + source.get('timeout', DEFAULT_SOURCE_TIMEOUT)
+        threading.Thread(target=_run_source, args=(source, deadlines[source['name']], results_queue), daemon=True).start()
+
+    results = {}
+    while deadlines:
+        wait = max(0, min(deadlines.values()) - time.monotonic())
+        try:
+            name, result, error = results_queue.get(timeout=wait)
+        except queue.Empty:
+            now = time.monotonic()
+            for name, deadline in list(deadlines.items()):
+                if deadline <= now:
+                    print(f"Source '{name}' missed its deadline ({deadline - start:.0f}s), dropping it")
+                    del deadlines[name]
+            continue
+
+        if name not in deadlines:
+            continue
+        del deadlines[name]
+        if error:
+            print(f"Source '{name}' failed: {error}")
+        else:
+            results[name] = result
+            print(f"Source '{name}' finished in {time.monotonic() - start:.1f}s")
+    return results
@@ -1,15 +1,157 @@
 import os
 import re
+import sys
 import json
 import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
+from urllib.parse import urljoin
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from core import http
+from core.parse import make_soup, SoupStrainer
+from core import jsliteral
+from core.diff import diff_columns, KEY_SEPARATOR
+from core.digest import canonical_digest, read_digest, write_digest
+from core.snapshot import SnapshotStore
+from core.render import Template, stylesheet_link, write_html, write_mail_copy
+
+# ETag / Last-Modified validators, restored by CI together with data.json
+HTTP_CACHE = http.ValidatorCache('./modules/99/http_cache.json', artifact='./modules/99/data.json')
+
+# data.json，每次运行最多读一次、写一次
+SNAPSHOT = SnapshotStore('./modules/99/data.json')
+
+# HTML fallback only reads leaderboard tables and inline scripts
+FALLBACK_ELEMENTS = SoupStrainer(['table', 'script'])
+
+# loadPageData 分页参数与上限
+API_URL = os.environ.get('NINETYNINE_API_URL', 'https://hd.99.com/jz/qxhd/?r=/Index/loadPageData')
+PAGE_PARAM = os.environ.get('NINETYNINE_PAGE_PARAM', 'page')
+MAX_PAGES = int(os.environ.get('NINETYNINE_MAX_PAGES', 100))
+PAGE_COUNT_FIELDS = ('pagecount', 'pageCount', 'page_count', 'total_page', 'totalPage', 'total_pages', 'pages')
+TOTAL_FIELDS = ('total', 'count', 'totalCount', 'total_count')
+
+# 页面脚本中可能发出 loadPageData 请求的调用
+JS_REQUEST_CALLS = ('post', 'get', 'getJSON', 'ajax')
+
+
+def parse_score(value):
+    """花数量转为整数，无法识别时返回 None"""
+    text = str(value).replace(',', '').strip() if value is not None else ''
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return int(float(text))
+        except (ValueError, OverflowError):
+            # 'nan' / 'inf' / '1e400' 之类无法转为整数
+            return None
+
+
+class Entry:
+    """排行榜中的一条记录"""
+    __slots__ = ('rank', 'server', 'player', 'score', 'raw_score')
+
+    def __init__(self, rank, server, player, score, raw_score):
+        self.rank = rank
+        self.server = server
+        self.player = player
+        self.score = score
+        self.raw_score = raw_score
+
+
+class Leaderboard:
+    """以 (服务器, 玩家) 为键的排行榜，同名玩家在不同服务器上互不覆盖"""
+
+    def __init__(self):
+        self.entries = {}
+
+    @classmethod
+    def from_records(cls, records):
+        board = cls()
+        for position, record in enumerate(records, 1):
+            board.add(record, position)
+        return board
+
+    def add(self, record, position=None):
+        """加入一条 {'number', 'fwq', 'player', 'hkzs'} 记录，重复的键保留排名靠前的一条"""
+        rank = parse_score(record.get('number'))
+        entry = Entry(
+            rank if rank is not None else position,
+            record.get('fwq', ''),
+            record.get('player', ''),
+            parse_score(record.get('hkzs')),
+            record.get('hkzs', ''),
+        )
+        key = (entry.server, entry.player)
+        existing = self.entries.get(key)
+        if existing is None or (entry.rank or 0) < (existing.rank or 0):
+            self.entries[key] = entry
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __eq__(self, other):
+        return isinstance(other, Leaderboard) and self.scores() == other.scores()
+
+    def scores(self):
+        return {key: (entry.rank, entry.score, entry.raw_score) for key, entry in self.entries.items()}
+
+    def ranked(self):
+        return sorted(self.entries.values(), key=lambda e: (e.rank is None, e.rank or 0))
+
+    def to_records(self):
+        return [{
+            'number': str(entry.rank) if entry.rank is not None else '',
+            'fwq': entry.server,
+            'player': entry.player,
+            'hkzs': entry.raw_score,
+        } for entry in self.ranked()]
+
+    def columns(self):
+        """供 core.diff 使用的列式数据，缺失值为 NaN"""
+        entries = list(self.entries.values())
+        nan = float('nan')
+        return entries, {
+            '_key': [f"{e.server}{KEY_SEPARATOR}{e.player}" for e in entries],
+            'score': [float(e.score) if e.score is not None else nan for e in entries],
+            'rank': [float(e.rank) if e.rank is not None else nan for e in entries],
+            'raw_score': [e.raw_score for e in entries],
+        }
+
+
+def diff_leaderboards(previous, current):
+    """
+    比较两份排行榜，返回 (新增, 移除, 变化) 三个列表：
+    变化项为 (当前记录, 之前记录, 分数变化, 名次上升数)，无法计算时为 None
+    """
+    prev_entries, prev_cols = previous.columns()
+    cur_entries, cur_cols = current.columns()
+    fields = ('score', 'rank', 'raw_score')
+    diff = diff_columns(prev_cols, cur_cols, fields=fields, numeric=('score', 'rank'))
+
+    # 合并分数与名次的变化，每个玩家只报告一次
+    moved = {}
+    for field in fields:
+        cur_idx, prev_idx = diff['changed'][field]
+        for i, j in zip(cur_idx, prev_idx):
+            moved[int(i)] = int(j)
+    changed = []
+    for i, j in sorted(moved.items(), key=lambda item: cur_entries[item[0]].rank or 0):
+        cur, prev = cur_entries[i], prev_entries[j]
+        score_delta = cur.score - prev.score if cur.score is not None and prev.score is not None else None
+        rank_delta = prev.rank - cur.rank if cur.rank is not None and prev.rank is not None else None
+        changed.append((cur, prev, score_delta, rank_delta))
+
+    added = [cur_entries[i] for i in diff['added']]
+    removed = [prev_entries[j] for j in diff['removed']]
+    return added, removed, changed
 
 
 def scrape_99_data_enhanced():
     """增强版99.com数据抓取器，尝试多种方式获取数据"""
     base_url = "https://hd.99.com/jz/qxhd/"
-    api_url = "https://hd.99.com/jz/qxhd/?r=/Index/loadPageData"
+    api_url = API_URL
     
     headers = {
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_12_4) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/57.0.2987.133 Safari/537.36',
@@ -19,25 +161,27 @@ def scrape_99_data_enhanced():
     }
     
     try:
-        # 首先尝试直接调用API
+        # 首先尝试直接调用API，逐页抓取完整排行榜
         print("尝试调用API获取数据...")
-        api_res = requests.get(api_url, headers=headers, timeout=30)
+        pages, status = crawl_api_pages(headers)
+        
+        if status == 304:
+            print("API数据未修改 (304)")
+            return None, 304
         
-        if api_res.status_code == 200:
-            try:
-                api_data = api_res.json()
-                if api_data and 'info' in api_data and api_data['info']:
-                    print(f"API调用成功，获取到 {len(api_data['info'])} 条记录")
-                    return parse_api_data(api_data), 200
-            except json.JSONDecodeError:
-                print("API返回的不是有效JSON格式")
+        if pages:
+            print(f"API调用成功，共 {len(pages)} 页")
+            return parse_api_data(pages), 200
         
         # 如果API调用失败，尝试解析HTML页面
         print("API调用失败，尝试解析HTML页面...")
-        page_res = requests.get(base_url, headers=headers, timeout=30)
+        page_res = http.conditional_get(base_url, HTTP_CACHE, headers=headers, timeout=30)
+        if page_res.status_code == 304:
+            print("页面未修改 (304)")
+            return None, 304
         page_res.raise_for_status()
         
-        soup = BeautifulSoup(page_res.text, 'html.parser')
+        soup = make_soup(page_res.text, only=FALLBACK_ELEMENTS)
         
         # 查找表格数据
         tables = soup.find_all('table')
@@ -61,14 +205,19 @@ def scrape_99_data_enhanced():
         # 如果没有找到表格，尝试从JavaScript中提取
         if not data:
             print("未找到表格数据，尝试从JavaScript中提取...")
-            scripts = soup.find_all('script')
-            for script in scripts:
-                if script.string and 'loadPageData' in script.string:
-                    js_content = script.string
-                    # 尝试模拟JavaScript执行
-                    data = extract_data_from_js(js_content)
-                    if data:
-                        break
+            request = None
+            for script in soup.find_all('script'):
+                if not script.string:
+                    continue
+                tokens = jsliteral.tokenize(script.string)
+                data = extract_data_from_js(script.string, tokens)
+                if data:
+                    break
+                if request is None and 'loadPageData' in script.string:
+                    request = load_page_data_request(script.string, tokens)
+            # 脚本里没有内联数据时，按脚本中的请求参数再试一次 API
+            if not data and request:
+                data = fetch_js_request(base_url, request, headers)
         
         # 添加时间戳
         result = {
@@ -88,82 +237,252 @@ def scrape_99_data_enhanced():
         return {'error': str(e), 'timestamp': datetime.now().isoformat()}, 500
 
 
-def parse_api_data(api_data):
-    """解析API返回的数据"""
-    data = []
-    if 'info' in api_data and api_data['info']:
+def api_page_url(page):
+    return API_URL if page == 1 else f"{API_URL}&{PAGE_PARAM}={page}"
+
+
+def read_api_page(res):
+    """返回 API 单页的 JSON，非 200、非 JSON 或没有 info 时返回 None"""
+    if res is None or res.status_code != 200:
+        return None
+    try:
+        api_data = res.json()
+    except ValueError:
+        print("API返回的不是有效JSON格式")
+        return None
+    if isinstance(api_data, dict) and api_data.get('info'):
+        return api_data
+    return None
+
+
+def page_count(api_data):
+    """从首页响应中推断总页数，无法推断时返回 None"""
+    for field in PAGE_COUNT_FIELDS:
+        count = parse_score(api_data.get(field))
+        if count:
+            return min(count, MAX_PAGES)
+    page_size = len(api_data['info'])
+    for field in TOTAL_FIELDS:
+        total = parse_score(api_data.get(field))
+        if total:
+            return min(-(-total // page_size), MAX_PAGES)
+    return None
+
+
+def previous_page_count():
+    return (SNAPSHOT.previous or {}).get('total_pages')
+
+
+def fetch_api_pages(pages, headers, conditional=True):
+    """并发抓取若干页 (共享连接池，最多 DEFAULT_WORKERS 个并发)，返回 {页码: 响应}"""
+    results = http.fetch_all(
+        [api_page_url(page) for page in pages],
+        cache=HTTP_CACHE if conditional else None,
+        headers=headers,
+        timeout=30,
+    )
+    responses = {}
+    for page, (res, error) in zip(pages, results):
+        if error:
+            raise requests.RequestException(f"第 {page} 页抓取失败: {error}")
+        responses[page] = res
+    return responses
+
+
+def crawl_api_pages(headers):
+    """
+    抓取 loadPageData 的所有分页，返回 ([每页 JSON], 状态码)。
+    所有页都返回 304 时视为未变化；只要有一页变化，304 的页会不带校验头重新抓取。
+    总页数未知时按 DEFAULT_WORKERS 页一批向后探测，直到出现空页或重复页。
+    """
+    first = fetch_api_pages([1], headers)[1]
+    if first.status_code == 304:
+        total = previous_page_count()
+        if total is None:
+            first = fetch_api_pages([1], headers, conditional=False)[1]
+    first_data = read_api_page(first) if first.status_code != 304 else None
+    if first.status_code != 304:
+        if first_data is None:
+            return [], first.status_code
+        total = page_count(first_data)
+    
+    if total is not None:
+        responses = fetch_api_pages(list(range(2, total + 1)), headers)
+        responses[1] = first
+        stale = [page for page, res in responses.items() if res.status_code == 304]
+        if len(stale) == len(responses):
+            return [], 304
+        if stale:
+            responses.update(fetch_api_pages(stale, headers, conditional=False))
+        pages = []
+        for page in sorted(responses):
+            api_data = read_api_page(responses[page])
+            if api_data is None:
+                raise requests.RequestException(f"第 {page} 页没有数据 (状态码 {responses[page].status_code})")
+            api_data['page'] = page
+            pages.append(api_data)
+        return pages, 200
+    
+    # 未给出总页数：成批探测后续页面
+    first_data['page'] = 1
+    pages = [first_data]
+    seen = {json.dumps(first_data['info'], sort_keys=True)}
+    page = 2
+    while page <= MAX_PAGES:
+        batch = list(range(page, min(page + http.DEFAULT_WORKERS, MAX_PAGES + 1)))
+        responses = fetch_api_pages(batch, headers, conditional=False)
+        for number in batch:
+            api_data = read_api_page(responses[number])
+            # 空页或与已抓取页面相同 (服务端忽略分页参数) 说明已到末尾
+            fingerprint = json.dumps(api_data['info'], sort_keys=True) if api_data else None
+            if fingerprint is None or fingerprint in seen:
+                return pages, 200
+            seen.add(fingerprint)
+            api_data['page'] = number
+            pages.append(api_data)
+        page += len(batch)
+    return pages, 200
+
+
+def api_record(item):
+    """API 返回的一条排行记录 -> {'number', 'fwq', 'player', 'hkzs'}"""
+    return {
+        'number': str(item.get('rank', '')),
+        'fwq': item.get('server_name', ''),
+        'player': item.get('user_name', ''),
+        'hkzs': str(item.get('rank_flower', ''))
+    }
+
+
+def parse_api_data(pages):
+    """解析API返回的所有分页，合并为以 (服务器, 玩家) 为键的排行榜"""
+    board = Leaderboard()
+    position = 0
+    for api_data in pages:
         for item in api_data['info']:
-            row_data = {
-                'number': str(item.get('rank', '')),
-                'fwq': item.get('server_name', ''),
-                'player': item.get('user_name', ''),
-                'hkzs': str(item.get('rank_flower', ''))
-            }
-            data.append(row_data)
+            position += 1
+            board.add(api_record(item), position)
+    data = board.to_records()
     
     result = {
         'timestamp': datetime.now().isoformat(),
         'url': 'https://hd.99.com/jz/qxhd/',
-        'api_url': 'https://hd.99.com/jz/qxhd/?r=/Index/loadPageData',
+        'api_url': API_URL,
         'data': data,
         'total_records': len(data),
+        'total_pages': len(pages),
         'method': 'api_call'
     }
     
     return result
 
 
-def extract_data_from_js(js_content):
-    """从JavaScript代码中提取数据"""
-    # 这里可以实现更复杂的JavaScript解析逻辑
-    # 目前返回空列表，表示需要进一步开发
-    return []
+def js_record_lists(value):
+    """在脚本字面量中递归查找排行榜记录列表 (API 格式或表格格式)"""
+    if isinstance(value, dict):
+        for child in value.values():
+            yield from js_record_lists(child)
+    elif isinstance(value, list):
+        if value and all(isinstance(item, dict) for item in value):
+            if all('user_name' in item for item in value):
+                yield [api_record(item) for item in value]
+                return
+            if all('player' in item and 'fwq' in item for item in value):
+                yield [{field: str(item.get(field, '')) for field in ('number', 'fwq', 'player', 'hkzs')} for item in value]
+                return
+        for child in value:
+            yield from js_record_lists(child)
 
 
-def get_previous_data():
-    """获取之前的数据用于比较"""
-    try:
-        # 检查是否存在备份文件（保存新数据前的旧数据）
-        if os.path.exists('./modules/99/data.json.backup'):
-            with open('./modules/99/data.json.backup', 'r', encoding='utf-8') as f:
-                return json.load(f)
-        # 如果没有备份文件，检查当前文件
-        elif os.path.exists('./modules/99/data.json'):
-            with open('./modules/99/data.json', 'r', encoding='utf-8') as f:
-                return json.load(f)
-    except:
-        pass
+def extract_data_from_js(js_content, tokens=None):
+    """从内联 JavaScript 的数组 / 对象字面量中提取排行榜记录 (只做词法分析，不执行脚本)"""
+    board = Leaderboard()
+    position = 0
+    for value in jsliteral.literals(js_content, tokens):
+        for records in js_record_lists(value):
+            for record in records:
+                position += 1
+                board.add(record, position)
+    return board.to_records()
+
+
+def load_page_data_request(js_content, tokens=None):
+    """
+    从 $.post / $.get / $.ajax 等调用中找出 loadPageData 请求，
+    返回 (url, 参数, 请求方法)，找不到时返回 None。
+    参数中的变量 (如 page: p) 无法静态求值，直接略去
+    """
+    for name, args in jsliteral.calls(js_content, JS_REQUEST_CALLS, tokens):
+        if not args:
+            continue
+        first = args[0]
+        if isinstance(first, str) and 'loadPageData' in first:
+            url, params = first, args[1] if len(args) > 1 else {}
+            method = 'post' if name == 'post' else 'get'
+        elif isinstance(first, dict) and isinstance(first.get('url'), str) and 'loadPageData' in first['url']:
+            url, params = first['url'], first.get('data')
+            method = first.get('type') or first.get('method')
+            method = method.lower() if isinstance(method, str) else 'get'
+        else:
+            continue
+        if not isinstance(params, dict):
+            params = {}
+        params = {k: v for k, v in params.items() if not isinstance(v, jsliteral.NotLiteral)}
+        return url, params, method
     return None
 
 
+def fetch_js_request(base_url, request, headers):
+    """按页面脚本中的 loadPageData 参数请求一次 API，返回记录列表"""
+    url, params, method = request
+    url = urljoin(base_url, url)
+    print(f"按页面脚本参数请求API: {method.upper()} {url} {params}")
+    session = http.get_session()
+    try:
+        if method == 'post':
+            res = session.post(url, data=params, headers=headers, timeout=30)
+        else:
+            res = session.get(url, params=params, headers=headers, timeout=30)
+    except requests.RequestException as e:
+        print(f"按页面脚本参数请求API失败: {e}")
+        return []
+    api_data = read_api_page(res)
+    return parse_api_data([api_data])['data'] if api_data else []
+
+
 def analyze_changes(current_data, previous_data):
     """分析数据变化，返回变化信息"""
     if not previous_data or 'data' not in previous_data:
         return "首次抓取数据，无法比较变化"
     
-    changes = []
-    current_players = {item['player']: int(item['hkzs']) for item in current_data['data']}
-    previous_players = {item['player']: int(item['hkzs']) for item in previous_data['data']}
+    added, removed, changed = diff_leaderboards(
+        Leaderboard.from_records(previous_data['data']),
+        Leaderboard.from_records(current_data['data']),
+    )
     
+    changes = []
     # 检查现有玩家的变化
-    for player in current_players:
-        if player in previous_players:
-            current_value = current_players[player]
-            previous_value = previous_players[player]
-            if current_value != previous_value:
-                diff = current_value - previous_value
-                change_symbol = "+" if diff > 0 else ""
-                changes.append(f"{player}: {change_symbol}{diff}")
+    for cur, prev, score_delta, rank_delta in changed:
+        parts = []
+        if score_delta is not None:
+            if score_delta:
+                parts.append(f"{'+' if score_delta > 0 else ''}{score_delta}")
+        elif cur.raw_score != prev.raw_score:
+            # 非数字的花数量无法相减，直接展示前后取值
+            parts.append(f"{prev.raw_score} -> {cur.raw_score}")
+        if rank_delta:
+            arrow = "↑" if rank_delta > 0 else "↓"
+            parts.append(f"排名 {prev.rank} -> {cur.rank} ({arrow}{abs(rank_delta)})")
+        if parts:
+            changes.append(f"{cur.player}@{cur.server}: {', '.join(parts)}")
     
     # 检查新增的玩家
-    for player in current_players:
-        if player not in previous_players:
-            changes.append(f"{player}: +{current_players[player]} (新增)")
+    for entry in added:
+        changes.append(f"{entry.player}@{entry.server}: +{entry.raw_score} (新增, 排名 {entry.rank})")
     
     # 检查移除的玩家
-    for player in previous_players:
-        if player not in current_players:
-            changes.append(f"{player}: -{previous_players[player]} (移除)")
+    for entry in removed:
+        changes.append(f"{entry.player}@{entry.server}: -{entry.raw_score} (移除)")
     
     if not changes:
         return "数据无变化"
@@ -171,168 +490,143 @@ def analyze_changes(current_data, previous_data):
     return "变化详情:\n" + "\n".join(changes)
 
 
-def has_data_changed(new_data):
-    """检查数据是否真的发生了变化"""
+def has_data_changed(new_data, digest):
+    """检查数据是否真的发生了变化：优先比较内容摘要，没有摘要时才读取旧数据"""
     try:
-        if os.path.exists('./modules/99/data.json'):
-            with open('./modules/99/data.json', 'r', encoding='utf-8') as f:
-                old_data = json.load(f)
-            
-            # 比较关键数据字段
-            if old_data.get('total_records') != new_data.get('total_records'):
-                return True
-            
-            # 比较玩家数据
-            old_players = {item['player']: item['hkzs'] for item in old_data.get('data', [])}
-            new_players = {item['player']: item['hkzs'] for item in new_data.get('data', [])}
-            
-            return old_players != new_players
-        return True  # 文件不存在，认为有变化
+        if not SNAPSHOT.exists():
+            return True  # 文件不存在，认为有变化
+        stored_digest = read_digest(SNAPSHOT.path)
+        if stored_digest:
+            return stored_digest != digest
+        
+        old_data = SNAPSHOT.previous
+        if old_data is None:
+            return True
+        
+        # 比较关键数据字段
+        if old_data.get('total_records') != new_data.get('total_records'):
+            return True
+        
+        # 比较排行榜数据
+        return Leaderboard.from_records(old_data.get('data', [])) != Leaderboard.from_records(new_data.get('data', []))
     except Exception as e:
         print(f"检查数据变化时出错: {e}")
         return True  # 出错时认为有变化
 
 
+REPORT_PAGE = Template("""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>99.com 数据抓取结果</title>
+$stylesheet
+</head>
+<body>
+<div class="container">
+<div class="header">
+<h1>99.com 数据抓取结果</h1>
+<a class="home" href="../../index.html">🏠 返回首页</a>
+</div>
+<div class="summary">
+<div class="timestamp">抓取时间: $timestamp</div>
+<div>
+<strong>总记录数:</strong> $total_records<br>
+<strong>数据源:</strong> $url<br>
+<strong>抓取方式:</strong> $method
+</div>
+</div>
+""")
+
+TABLE_START = """<table>
+<thead><tr><th>排名</th><th>服务器</th><th>玩家</th><th>花数量</th></tr></thead>
+<tbody>
+"""
+
+TABLE_ROW = Template('<tr><td>$position</td><td>$fwq</td><td>$player</td><td>$hkzs</td></tr>\n')
+
+TABLE_END = """</tbody>
+</table>
+"""
+
+REPORT_END = Template("""<div class="changes">
+<strong>📊 数据变化分析</strong>
+<pre>$changes</pre>
+</div>
+</div>
+</body>
+</html>
+""")
+
+
+def table_rows(records):
+    for position, record in enumerate(records, 1):
+        yield {
+            'position': position,
+            'fwq': record.get('fwq', ''),
+            'player': record.get('player', ''),
+            'hkzs': record.get('hkzs', ''),
+        }
+
+
+def render_report(data, changes_info):
+    yield REPORT_PAGE.render(
+        stylesheet=stylesheet_link(),
+        timestamp=data.get('timestamp', 'N/A'),
+        total_records=data.get('total_records', 0),
+        url=data.get('url', 'N/A'),
+        method=data.get('method', 'N/A'),
+    )
+    if data.get('data'):
+        yield TABLE_START
+        yield from TABLE_ROW.render_all(table_rows(data['data']))
+        yield TABLE_END
+    else:
+        yield "<p>未找到数据或出现错误</p>"
+    yield REPORT_END.render(changes=changes_info)
+
+
+def generate_html(data, changes_info):
+    """生成包含排行榜和变化分析的 data.html"""
+    write_html('./modules/99/data.html', render_report(data, changes_info))
+    write_mail_copy('./modules/99/data.html', './modules/99/mail.html')
+
+
 def save_data(data, status_code):
     """保存数据到文件"""
-    if status_code == 200:
+    if status_code == 304:
+        print("📊 数据未修改 (304)，跳过解析、对比和文件生成")
+    elif status_code == 200:
         print("=== 开始保存数据流程 ===")
         
         # 先检查数据是否真的变化了
-        if has_data_changed(data):
+        digest = canonical_digest(data)
+        if has_data_changed(data, digest):
             print("📊 检测到数据变化，开始保存文件...")
             
-            # 1. 检查并备份：如果存在旧数据，将其变为backup
-            if os.path.exists('./modules/99/data.json'):
-                print("发现现有 data.json，准备备份...")
-                try:
-                    import shutil
-                    shutil.copy2('./modules/99/data.json', './modules/99/data.json.backup')
-                    print("✅ 已备份旧数据到 data.json.backup")
-                except Exception as e:
-                    print(f"❌ 备份旧数据失败: {e}")
-            else:
-                print("📝 首次运行，没有现有数据需要备份")
-            
-            # 2. 获取历史数据用于对比（在保存新数据之前）
+            # 1. 获取历史数据用于对比（一次读取，保存在内存中）
             print("正在获取历史数据用于对比...")
-            previous_data = get_previous_data()
+            previous_data = SNAPSHOT.previous
             if previous_data:
                 print("📊 找到历史数据，将用于对比分析")
             else:
                 print("🆕 没有历史数据，这是首次抓取")
             
-            # 3. 拉取最新数据：保存新数据作为 data.json
+            # 2. 原子写入新数据：先写临时文件再重命名，中途失败不会损坏 data.json
             print("正在保存新数据...")
-            with open('./modules/99/data.json', 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            SNAPSHOT.save(data)
+            write_digest(SNAPSHOT.path, digest)
             print(f"✅ 新数据已保存到 data.json，共 {data.get('total_records', 0)} 条记录")
             
-            # 4. 对比分析：将新数据与历史数据做对比
+            # 3. 对比分析：将新数据与历史数据做对比
             print("正在分析数据变化...")
             changes_info = analyze_changes(data, previous_data)
             print(f"📈 变化信息: {changes_info}")
             
-            # 5. 生成邮件：创建包含变化分析的 data.html
+            # 4. 生成邮件：创建包含变化分析的 data.html
             print("正在生成邮件HTML...")
-            html_content = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="utf-8">
-                <title>99.com 数据抓取结果</title>
-                <style>
-                    body { font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif; margin: 0; background: #f5f7fa; color: #333; }
-                    .container { max-width: 1000px; margin: 0 auto; padding: 20px; }
-                    .header { background: #2c3e50; color: white; padding: 20px; border-radius: 8px 8px 0 0; display: flex; justify-content: space-between; align-items: center; }
-                    .header h1 { margin: 0; font-size: 1.5em; }
-                    .header a { color: white; text-decoration: none; background: rgba(255,255,255,0.2); padding: 5px 10px; border-radius: 4px; font-size: 0.9em; }
-                    
-                    table { border-collapse: collapse; width: 100%; margin-top: 0; box-shadow: 0 1px 3px rgba(0,0,0,0.1); background: white; }
-                    th, td { padding: 12px 15px; text-align: left; border-bottom: 1px solid #ddd; }
-                    th { background-color: #f8f9fa; font-weight: 600; color: #2c3e50; }
-                    tr:hover { background-color: #f5f5f5; }
-                    
-                    .summary { background-color: white; padding: 20px; border-radius: 0 0 8px 8px; margin-bottom: 20px; box-shadow: 0 1px 3px rgba(0,0,0,0.1); }
-                    .timestamp { color: #666; font-size: 14px; margin-bottom: 10px; }
-                    .changes { background-color: #fff3cd; padding: 15px; border-radius: 5px; margin: 20px 0; border-left: 5px solid #ffc107; }
-                    .changes pre { margin: 0; white-space: pre-wrap; font-family: monospace; }
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <div class="header">
-                        <h1>99.com 数据抓取结果</h1>
-                        <a href="../../index.html">🏠 返回首页</a>
-                    </div>
-                    <div class="summary">
-                        <div class="timestamp">抓取时间: {data.get('timestamp', 'N/A')}</div>
-                        <div>
-                            <strong>总记录数:</strong> {data.get('total_records', 0)}<br>
-                            <strong>数据源:</strong> {data.get('url', 'N/A')}<br>
-                            <strong>抓取方式:</strong> {data.get('method', 'N/A')}
-                        </div>
-                    </div>
-            """
-            
-            if data.get('data'):
-                html_content += """
-                <table>
-                    <thead>
-                        <tr>
-                            <th>排名</th>
-                            <th>服务器</th>
-                            <th>玩家</th>
-                            <th>花数量</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-                """
-                
-                for i, record in enumerate(data['data'], 1):
-                    html_content += f"""
-                        <tr>
-                            <td>{i}</td>
-                            <td>{record.get('fwq', '')}</td>
-                            <td>{record.get('player', '')}</td>
-                            <td>{record.get('hkzs', '')}</td>
-                        </tr>
-                    """
-                
-                html_content += """
-                    </tbody>
-                </table>
-                """
-            else:
-                html_content += "<p>未找到数据或出现错误</p>"
-            
-            # 添加变化信息
-            html_content += f"""
-            <div class="changes">
-                <strong>📊 数据变化分析</strong>
-                <pre>{changes_info}</pre>
-            </div>
-            """
-            
-            html_content += """
-            </body>
-            </html>
-            """
-            
-            with open('./modules/99/data.html', 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            generate_html(data, changes_info)
             print("✅ 邮件HTML已生成: data.html")
             
-            # 6. 清理backup：删除 data.json.backup，为下次运行做准备
-            if os.path.exists('./modules/99/data.json.backup'):
-                try:
-                    os.remove('./modules/99/data.json.backup')
-                    print("🗑️ 已清理 backup 文件: data.json.backup")
-                except Exception as e:
-                    print(f"❌ 清理 backup 文件失败: {e}")
-            else:
-                print("📝 没有backup文件需要清理")
-            
             print("=== 数据保存流程完成 ===")
         else:
             print("📊 数据无变化，跳过文件保存")
@@ -347,3 +641,5 @@ def save_data(data, status_code):
 if __name__ == "__main__":
     data, status_code = scrape_99_data_enhanced()
     save_data(data, status_code)
+    if status_code == 200:
+        HTTP_CACHE.save()
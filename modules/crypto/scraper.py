@@ -1,11 +1,23 @@
 import os
+import sys
 import json
-import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
 import time
+import threading
+from collections import Counter
+from datetime import datetime
 from duckduckgo_search import DDGS
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from core import http
+from core.parse import make_soup
+from core.embedded import json_after
+from core.match import KeywordClassifier, host_matches
+from core.dedup import near_duplicate_clusters
+from core.sources import run_sources
+from core.digest import canonical_digest, is_unchanged, write_digest
+from core.render import Template, stylesheet_link, write_html, write_mail_copy
+from core.snapshot import SnapshotStore
+
 def search_ddg(query, max_results=10):
     """Search DuckDuckGo for query"""
     print(f"Searching DDG for: {query}")
@@ -30,6 +42,147 @@ def search_ddg(query, max_results=10):
     print(f"  Total DDG results for '{query}': {len(results)}")
     return results
 
+# airdrops.io detail pages are fetched concurrently; this keeps us polite to the server
+AIRDROPS_IO_LIMITER = http.HostRateLimiter(rate=4)
+
+# Details extracted from airdrops.io pages in earlier runs, restored by CI
+ITEM_STORE_PATH = './modules/crypto/items.json'
+# Seconds before a detail page is fetched again even if its listing entry is unchanged
+DETAIL_TTL = float(os.environ.get('CRYPTO_DETAIL_TTL_HOURS', 24)) * 3600
+
+def listing_text(tag):
+    """Text of a listing tag with whitespace collapsed, the same whichever scraper reads it"""
+    return ' '.join(tag.get_text(' ').split())
+
+def listing_fingerprint(title, desc):
+    """Fingerprint of a listing entry, to notice when its detail page may have changed"""
+    return canonical_digest([title, desc])[:16]
+
+class ItemStore:
+    """
+    Strategy / quantity / end date extracted from each detail page, keyed by
+    normalized URL, with the fingerprint of the listing entry it was fetched
+    for and the fetch time. Shared by the concurrent sources.
+    """
+
+    def __init__(self, path, ttl=DETAIL_TTL):
+        self.snapshot = SnapshotStore(path)
+        self.ttl = ttl
+        previous = self.snapshot.previous
+        self.items = previous if isinstance(previous, dict) else {}
+        self.changed = False
+        self._lock = threading.Lock()
+
+    def lookup(self, url, fingerprint):
+        """Stored details for url, None when missing, fetched for another listing entry or expired"""
+        with self._lock:
+            entry = self.items.get(http.normalize_url(url))
+        if entry and entry.get('fingerprint') == fingerprint and time.time() - entry.get('fetched_at', 0) < self.ttl:
+            return entry
+        return None
+
+    def update(self, url, fingerprint, strategy, quantity, end_date):
+        with self._lock:
+            self.items[http.normalize_url(url)] = {
+                'fingerprint': fingerprint,
+                'strategy': strategy,
+                'quantity': quantity,
+                'end_date': end_date,
+                'fetched_at': int(time.time())
+            }
+            self.changed = True
+
+    def save(self):
+        """Write the store when something was fetched, dropping expired entries"""
+        with self._lock:
+            if not self.changed:
+                return
+            now = time.time()
+            self.items = {url: entry for url, entry in self.items.items() if now - entry.get('fetched_at', 0) < self.ttl}
+            self.snapshot.save(self.items)
+            self.changed = False
+
+ITEM_STORE = ItemStore(ITEM_STORE_PATH)
+
+def parse_airdrops_io_detail(html):
+    """Extract (strategy, quantity, end_date) from an airdrops.io detail page"""
+    soup_detail = make_soup(html)
+    
+    # Extract Strategy (Guide)
+    strategy = "Check website for details."
+    guide_list = soup_detail.find('ul', class_='list-steps')
+    if not guide_list:
+        # Try finding "Step-by-Step Guide" text and getting the next list
+        guide_header = soup_detail.find(string=lambda text: text and "Step-by-Step Guide" in text)
+        if guide_header:
+            parent = guide_header.find_parent()
+            if parent:
+                next_ul = parent.find_next('ul')
+                if next_ul:
+                    guide_list = next_ul
+    
+    if guide_list:
+        steps = [li.get_text(strip=True) for li in guide_list.find_all('li')]
+        strategy = "\n".join([f"{idx+1}. {step}" for idx, step in enumerate(steps)])
+    
+    # Extract Metadata (Value, End Date)
+    quantity = "Unknown"
+    end_date = "Unknown"
+    
+    # Look for metadata list
+    meta_list = soup_detail.find('ul', class_='airdrop-meta')
+    if meta_list:
+        for li in meta_list.find_all('li'):
+            text = li.get_text(strip=True)
+            if "Value:" in text:
+                quantity = text.replace("Value:", "").strip()
+            elif "End Date:" in text:
+                end_date = text.replace("End Date:", "").strip()
+    
+    return strategy, quantity, end_date
+
+def fetch_airdrops_io_details(entries, headers, query, failed_strategy):
+    """
+    Fetch detail pages for (title, link, desc) entries concurrently.
+    Pages found in ITEM_STORE for the same listing entry are not fetched again.
+    Results keep the order of entries; a failing page only affects its own item.
+    """
+    fingerprints = [listing_fingerprint(title, desc) for title, _, desc in entries]
+    stored = [ITEM_STORE.lookup(link, fingerprint) for (_, link, _), fingerprint in zip(entries, fingerprints)]
+    stale = [i for i, entry in enumerate(stored) if entry is None]
+    print(f"    {len(entries) - len(stale)} detail pages unchanged, fetching {len(stale)}")
+    links = [entries[i][1] for i in stale]
+    responses = dict(zip(stale, http.fetch_all(links, rate_limiter=AIRDROPS_IO_LIMITER, headers=headers, timeout=10)))
+    
+    results = []
+    for i, (title, link, desc) in enumerate(entries):
+        if stored[i]:
+            strategy, quantity, end_date = stored[i]['strategy'], stored[i]['quantity'], stored[i]['end_date']
+        else:
+            res_detail, error = responses[i]
+            try:
+                if error:
+                    raise error
+                res_detail.raise_for_status()
+                strategy, quantity, end_date = parse_airdrops_io_detail(res_detail.text)
+                ITEM_STORE.update(link, fingerprints[i], strategy, quantity, end_date)
+            except Exception as e:
+                print(f"    Error fetching details for {title}: {e}")
+                strategy, quantity, end_date = failed_strategy, "Unknown", "Unknown"
+        
+        results.append({
+            'title': title,
+            'url': link,
+            'description': desc,
+            'source': 'airdrops.io',
+            'query': query,
+            'timestamp': datetime.now().isoformat(),
+            'strategy': strategy,
+            'quantity': quantity,
+            'end_date': end_date
+        })
+    return results
+
 def scrape_airdrops_io_search(query):
     """Scrape airdrops.io search results for specific query"""
     print(f"Scraping airdrops.io search for: {query}")
@@ -39,59 +192,31 @@ def scrape_airdrops_io_search(query):
     }
     results = []
     try:
-        res = requests.get(url, headers=headers, timeout=30)
+        res = http.get(url, headers=headers, timeout=30)
         res.raise_for_status()
-        soup = BeautifulSoup(res.text, 'html.parser')
+        soup = make_soup(res.text)
         
         articles = soup.find_all('article')
         print(f"  Found {len(articles)} articles for query '{query}'")
         
+        entries = []
         for article in articles:
             title_tag = article.find('h2', class_='entry-title')
             if not title_tag or not title_tag.a:
                 continue
                 
-            title = title_tag.a.text.strip()
+            title = listing_text(title_tag.a)
             link = title_tag.a['href']
             
             # Get description
             desc = ""
             desc_tag = article.find('div', class_='entry-content')
             if desc_tag:
-                desc = desc_tag.text.strip()
-                
-            # Fetch details
-            strategy = "Check website for details."
-            quantity = "Unknown"
-            end_date = "Unknown"
+                desc = listing_text(desc_tag)
             
-            try:
-                # Reuse the detail fetching logic if possible, or just keep it simple for search results
-                # Let's do a quick fetch
-                res_detail = requests.get(link, headers=headers, timeout=10)
-                soup_detail = BeautifulSoup(res_detail.text, 'html.parser')
-                
-                # Extract Strategy
-                guide_list = soup_detail.find('ul', class_='list-steps')
-                if guide_list:
-                    steps = [li.get_text(strip=True) for li in guide_list.find_all('li')]
-                    strategy = "\n".join([f"{idx+1}. {step}" for idx, step in enumerate(steps)])
-                    
-            except:
-                pass
-
-            results.append({
-                'title': title,
-                'url': link,
-                'description': desc,
-                'source': 'airdrops.io',
-                'query': query,
-                'timestamp': datetime.now().isoformat(),
-                'strategy': strategy,
-                'quantity': quantity,
-                'end_date': end_date
-            })
-            time.sleep(1)
+            entries.append((title, link, desc))
+        
+        results = fetch_airdrops_io_details(entries, headers, query, "Check website for details.")
             
     except Exception as e:
         print(f"Error scraping airdrops.io search: {e}")
@@ -106,14 +231,15 @@ def scrape_airdrops_io_latest():
     }
     results = []
     try:
-        res = requests.get(url, headers=headers, timeout=30)
+        res = http.get(url, headers=headers, timeout=30)
         res.raise_for_status()
-        soup = BeautifulSoup(res.text, 'html.parser')
+        soup = make_soup(res.text)
         
         articles = soup.find_all('article')
         print(f"  Found {len(articles)} articles on airdrops.io/latest")
         
-        for i, article in enumerate(articles):
+        entries = []
+        for article in articles:
             # Skip header article if it doesn't look like an airdrop
             if 'type-page' in article.get('class', []):
                 continue
@@ -126,72 +252,20 @@ def scrape_airdrops_io_latest():
             if not link_tag:
                 continue
                 
-            title = title_tag.get_text(strip=True)
+            title = listing_text(title_tag)
             link = link_tag['href']
             
             # Get basic description
             desc = ""
             content_div = article.find('div', class_='entry-content')
             if content_div:
-                desc = content_div.get_text(strip=True)
+                desc = listing_text(content_div)
             
-            # Fetch details page for more info
-            try:
-                print(f"    Fetching details for: {title}")
-                res_detail = requests.get(link, headers=headers, timeout=10)
-                soup_detail = BeautifulSoup(res_detail.text, 'html.parser')
-                
-                # Extract Strategy (Guide)
-                strategy = "Check website for details."
-                guide_list = soup_detail.find('ul', class_='list-steps')
-                if not guide_list:
-                    # Try finding "Step-by-Step Guide" text and getting the next list
-                    guide_header = soup_detail.find(string=lambda text: text and "Step-by-Step Guide" in text)
-                    if guide_header:
-                        parent = guide_header.find_parent()
-                        if parent:
-                            next_ul = parent.find_next('ul')
-                            if next_ul:
-                                guide_list = next_ul
-                
-                if guide_list:
-                    steps = [li.get_text(strip=True) for li in guide_list.find_all('li')]
-                    strategy = "\n".join([f"{idx+1}. {step}" for idx, step in enumerate(steps)])
-                
-                # Extract Metadata (Value, End Date)
-                quantity = "Unknown"
-                end_date = "Unknown"
-                
-                # Look for metadata list
-                meta_list = soup_detail.find('ul', class_='airdrop-meta')
-                if meta_list:
-                    for li in meta_list.find_all('li'):
-                        text = li.get_text(strip=True)
-                        if "Value:" in text:
-                            quantity = text.replace("Value:", "").strip()
-                        elif "End Date:" in text:
-                            end_date = text.replace("End Date:", "").strip()
-                
-            except Exception as e:
-                print(f"    Error fetching details for {title}: {e}")
-                strategy = "Failed to fetch details."
-                quantity = "Unknown"
-                end_date = "Unknown"
-
-            results.append({
-                'title': title,
-                'url': link,
-                'description': desc,
-                'source': 'airdrops.io',
-                'query': 'latest',
-                'timestamp': datetime.now().isoformat(),
-                'strategy': strategy,
-                'quantity': quantity,
-                'end_date': end_date
-            })
-            
-            # Be nice to the server
-            time.sleep(1)
+            entries.append((title, link, desc))
+        
+        # Fetch details pages for more info
+        print(f"    Fetching details for {len(entries)} airdrops...")
+        results = fetch_airdrops_io_details(entries, headers, 'latest', "Failed to fetch details.")
             
     except Exception as e:
         print(f"Error scraping airdrops.io: {e}")
@@ -207,13 +281,11 @@ def scrape_defillama_airdrops():
     }
     results = []
     try:
-        res = requests.get(url, headers=headers, timeout=30)
+        res = http.get(url, headers=headers, timeout=30)
         res.raise_for_status()
-        soup = BeautifulSoup(res.text, 'html.parser')
         
-        script = soup.find('script', id='__NEXT_DATA__')
-        if script:
-            data = json.loads(script.string)
+        data = json_after(res.content, 'id="__NEXT_DATA__"')
+        if data:
             pageProps = data.get('props', {}).get('pageProps', {})
             airdrops = pageProps.get('claimableAirdrops', [])
             
@@ -242,175 +314,196 @@ def scrape_defillama_airdrops():
     print(f"  Total DefiLlama results: {len(results)}")
     return results
 
+# Required keywords (must have at least one), developer keywords (must have
+# at least one) and (very basic) scam markers, matched as whole words
+KEYWORDS = KeywordClassifier({
+    'required': ['airdrop', 'claim', 'token', 'reward', 'incentive', 'devdrop'],
+    'dev': [
+        'github', 'developer', 'dev', 'commit', 'repo', 'repository',
+        'testnet', 'node', 'validator', 'contract', 'hackathon',
+        'bounty', 'sdk', 'api', 'protocol', 'stack', 'layer 2', 'l2',
+        'contributor', 'grant', 'technical'
+    ],
+    'scam': ['send eth', 'private key', 'seed phrase'],
+})
+
+# Blacklisted sites, including their subdomains
+BLACKLIST_DOMAINS = {
+    'github.com', 'wikipedia.org', 'google.com', 'facebook.com',
+    'youtube.com', 'twitter.com', 'x.com', 'linkedin.com',
+    'instagram.com', 'reddit.com'
+}
+
 def analyze_and_filter(items):
     """Filter and analyze items, keeping ONLY developer-relevant ones"""
     unique_items = {}
-    
-    # Required keywords (must have at least one)
-    required_keywords = ['airdrop', 'claim', 'token', 'reward', 'incentive', 'devdrop']
-    
-    # Developer keywords (must have at least one)
-    dev_keywords = [
-        'github', 'developer', 'dev', 'commit', 'repo', 
-        'testnet', 'node', 'validator', 'contract', 'hackathon', 
-        'bounty', 'sdk', 'api', 'protocol', 'stack', 'layer 2', 'l2',
-        'contributor', 'grant', 'technical'
-    ]
-    
-    # Blacklist domains
-    blacklist_domains = [
-        'github.com', 'wikipedia.org', 'google.com', 'facebook.com', 
-        'youtube.com', 'twitter.com', 'x.com', 'linkedin.com',
-        'instagram.com', 'reddit.com'
-    ]
+    templates = template_descriptions(items)
     
     for item in items:
         url = item['url']
         
         # Check blacklist
-        if any(domain in url for domain in blacklist_domains):
-            # Exception for raw content or specific paths if needed, but generally skip main sites
+        if host_matches(url, BLACKLIST_DOMAINS):
             continue
             
         # Simple deduplication by URL
-        if url in unique_items:
+        key = http.normalize_url(url)
+        if key in unique_items:
             continue
             
         # Check relevance
-        text = (item['title'] + " " + item['description'] + " " + item.get('strategy', '')).lower()
-        
-        # Must have required keyword
-        has_required = any(kw in text for kw in required_keywords)
-        if not has_required:
-            continue
-            
-        # Must have dev keyword
-        matched_keywords = []
-        for kw in dev_keywords:
-            if kw in text:
-                matched_keywords.append(kw)
+        text = item['title'] + " " + item['description'] + " " + item.get('strategy', '')
+        matched = KEYWORDS.classify(text)
         
-        if not matched_keywords:
+        # Must have required keyword and dev keyword
+        if not matched['required'] or not matched['dev']:
             continue
             
         # Calculate score based on number of matches
-        relevance_score = len(matched_keywords)
+        item['relevance_score'] = len(matched['dev'])
+        item['matched_keywords'] = matched['dev']
+        item['is_suspicious'] = bool(matched['scam'])
         
-        item['relevance_score'] = relevance_score
-        item['matched_keywords'] = matched_keywords
+        unique_items[key] = item
         
-        # Mark as potential scam if suspicious keywords found (very basic)
-        scam_keywords = ['send eth', 'private key', 'seed phrase']
-        is_suspicious = any(sk in text for sk in scam_keywords)
-        item['is_suspicious'] = is_suspicious
-        
-        unique_items[url] = item
-        
-    # Convert back to list and sort by relevance
-    sorted_items = sorted(unique_items.values(), key=lambda x: x['relevance_score'], reverse=True)
+    # Merge the same airdrop found under different URLs, then sort by relevance
+    merged_items = merge_near_duplicates(list(unique_items.values()), templates)
+    sorted_items = sorted(merged_items, key=lambda x: x['relevance_score'], reverse=True)
     return sorted_items
 
+def detail_rank(item):
+    """Prefer the copy with the most details as the canonical item of a cluster"""
+    return (item.get('quantity', 'Unknown') != 'Unknown', item.get('end_date', 'Unknown') != 'Unknown',
+            item['relevance_score'], len(item.get('description', '')))
+
+def template_descriptions(items):
+    """
+    (source, description) pairs shared by several items of one source, such
+    as DefiLlama's fixed "Claimable airdrop found on DefiLlama.": they say
+    nothing about which airdrop an item is. Counted over every scraped item,
+    before filtering leaves too few of them to tell.
+    """
+    listed = {(item['source'], item.get('description', ''), http.normalize_url(item['url'])) for item in items}
+    counts = Counter((source, description) for source, description, _ in listed)
+    return {pair for pair, count in counts.items() if count > 1}
+
+def cluster_text(item, templates):
+    """Title + description, or the title alone when the description is a source template"""
+    if (item['source'], item.get('description', '')) in templates:
+        return item['title']
+    return item['title'] + " " + item['description']
+
+def merge_near_duplicates(items, templates=frozenset()):
+    """
+    Collapse items whose title + description are near-duplicates (the same
+    airdrop from DuckDuckGo, airdrops.io and DefiLlama) into one canonical
+    item that lists every source link under 'links'
+    """
+    clusters = near_duplicate_clusters([cluster_text(item, templates) for item in items])
+    merged = []
+    for cluster in clusters:
+        members = [items[i] for i in cluster]
+        canonical = dict(max(members, key=detail_rank))
+        canonical['links'] = [{'url': m['url'], 'source': m['source']} for m in members]
+        if len(members) > 1:
+            canonical['matched_keywords'] = list(dict.fromkeys(kw for m in members for kw in m['matched_keywords']))
+            canonical['relevance_score'] = len(canonical['matched_keywords'])
+            canonical['is_suspicious'] = any(m['is_suspicious'] for m in members)
+        merged.append(canonical)
+    if len(merged) < len(items):
+        print(f"Merged {len(items)} items into {len(merged)} after near-duplicate clustering")
+    return merged
+
 def save_data(data):
     """Save data to JSON and generate HTML"""
     print("=== Saving Data ===")
     
+    # Same content as last time: keep the existing files untouched
+    digest = canonical_digest(data)
+    if is_unchanged('./modules/crypto/data.json', digest):
+        print("Content digest unchanged, skipping save")
+        return
+    
     # Save JSON
     os.makedirs('./modules/crypto', exist_ok=True)
     with open('./modules/crypto/data.json', 'w', encoding='utf-8') as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
+    write_digest('./modules/crypto/data.json', digest)
         
     # Generate HTML
     generate_html(data)
     print("=== Data Saved ===")
 
-def generate_html(data):
-    """Generate HTML report"""
-    items = data.get('items', [])
-    timestamp = data.get('timestamp')
-    
-    # Since we filter strictly, all items are dev items
-    dev_items = items
-    
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <title>GitHub Developer Airdrop Monitor</title>
-        <style>
-            body {{ font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif; margin: 20px; color: #333; line-height: 1.6; background-color: #f4f6f8; }}
-            .container {{ max-width: 1200px; margin: 0 auto; background: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.05); }}
-            .header {{ background: #24292e; color: white; padding: 20px; border-radius: 8px 8px 0 0; margin: -20px -20px 20px -20px; display: flex; justify-content: space-between; align-items: center; }}
-            .header h1 {{ margin: 0; font-size: 1.5em; }}
-            .header a {{ color: white; text-decoration: none; }}
-            
-            .section-title {{ 
-                margin: 30px 0 15px 0; 
-                padding-bottom: 10px; 
-                border-bottom: 2px solid #eee; 
-                font-size: 1.5em; 
-                color: #24292e; 
-                display: flex;
-                align-items: center;
-                gap: 10px;
-            }}
-            
-            .item {{ border: 1px solid #e1e4e8; padding: 20px; margin-bottom: 20px; border-radius: 6px; transition: all 0.2s; background: white; }}
-            .item:hover {{ box-shadow: 0 4px 12px rgba(0,0,0,0.1); border-color: #0366d6; }}
-            
-            .item-header {{ display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 15px; flex-wrap: wrap; gap: 10px; }}
-            .item-title {{ font-size: 1.4em; font-weight: 600; color: #0366d6; text-decoration: none; }}
-            .item-title:hover {{ text-decoration: underline; }}
-            
-            .tags {{ display: flex; gap: 8px; align-items: center; flex-wrap: wrap; }}
-            .tag {{ padding: 4px 8px; border-radius: 4px; font-size: 0.85em; font-weight: 500; }}
-            .tag-source {{ background: #f1f8ff; color: #0366d6; border: 1px solid #c8e1ff; }}
-            .tag-relevance {{ background: #fff5b1; color: #735c0f; border: 1px solid #f9e28b; }}
-            .tag-suspicious {{ background: #ffeef0; color: #cb2431; border: 1px solid #fdaeb7; }}
-            .tag-quantity {{ background: #d1fae5; color: #065f46; border: 1px solid #a7f3d0; }}
-            .tag-date {{ background: #f3f4f6; color: #4b5563; border: 1px solid #e5e7eb; }}
-            
-            .item-details {{ display: grid; grid-template-columns: 1fr; gap: 15px; margin-top: 15px; border-top: 1px solid #eee; padding-top: 15px; }}
-            @media (min-width: 768px) {{
-                .item-details {{ grid-template-columns: 2fr 1fr; }}
-            }}
-            
-            .detail-section h4 {{ margin: 0 0 8px 0; font-size: 0.95em; color: #586069; text-transform: uppercase; letter-spacing: 0.5px; }}
-            .strategy-text {{ white-space: pre-line; font-size: 0.95em; color: #24292e; background: #f6f8fa; padding: 10px; border-radius: 4px; border: 1px solid #eaecef; }}
-            
-            .footer {{ margin-top: 30px; text-align: center; color: #586069; font-size: 0.9em; border-top: 1px solid #eee; padding-top: 20px; }}
-            
-            .empty-state {{ padding: 30px; text-align: center; color: #586069; background: #f9f9f9; border-radius: 8px; border: 1px dashed #ddd; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <div>
-                    <h1>GitHub Developer Airdrop Monitor</h1>
-                    <div style="font-size: 0.8em; opacity: 0.8; margin-top: 5px;">Updated: {timestamp}</div>
-                </div>
-                <a href="../../index.html" style="background:rgba(255,255,255,0.2); padding:5px 10px; border-radius:4px; font-size:0.9em;">🏠 Home</a>
-            </div>
-            
-            <div style="padding: 15px; background: #e6fffa; border: 1px solid #b2f5ea; border-radius: 6px; margin-bottom: 25px; color: #234e52;">
-                <p style="margin: 0;">Found <strong>{len(items)}</strong> developer-focused opportunities.</p>
-                <p style="margin: 5px 0 0 0; font-size: 0.9em; opacity: 0.8;">⚠️ Disclaimer: Always do your own research (DYOR). Never share your private keys.</p>
-            </div>
-            
-            <h2 class="section-title">🎯 Developer & GitHub Focused</h2>
-            <div class="items">
-    """
-    
-    def render_item(item):
-        suspicious_html = '<span class="tag tag-suspicious">⚠️ Suspicious</span>' if item.get('is_suspicious') else ''
-        relevance_html = f'<span class="tag tag-relevance">Score: {item["relevance_score"]}</span>' if item["relevance_score"] > 0 else ''
-        quantity_html = f'<span class="tag tag-quantity">💰 {item.get("quantity", "Unknown")}</span>' if item.get("quantity") and item.get("quantity") != "Unknown" else ''
-        date_html = f'<span class="tag tag-date">📅 End: {item.get("end_date", "Unknown")}</span>'
-        
-        strategy_content = item.get('strategy', 'No strategy provided.')
-        if not strategy_content: strategy_content = "No strategy provided."
-        
+REPORT_PAGE = Template("""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>GitHub Developer Airdrop Monitor</title>
+$stylesheet
+</head>
+<body class="wide crypto">
+<div class="container">
+<div class="header">
+<div>
+<h1>GitHub Developer Airdrop Monitor</h1>
+<p class="subtitle">Updated: $timestamp</p>
+</div>
+<a class="home" href="../../index.html">🏠 Home</a>
+</div>
+<div class="notice">
+<p>Found <strong>$count</strong> developer-focused opportunities.</p>
+<p class="disclaimer">⚠️ Disclaimer: Always do your own research (DYOR). Never share your private keys.</p>
+</div>
+<h2 class="section-title">🎯 Developer & GitHub Focused</h2>
+<div class="items">
+""")
+
+REPORT_ITEM = Template("""<div class="item">
+<div class="item-header">
+<a href="$url" target="_blank" class="item-title">$title</a>
+<div class="tags"><span class="tag tag-source">$source</span>$relevance$quantity_tag$date_tag$suspicious</div>
+</div>
+<div class="item-description">$description</div>
+<div class="item-details">
+<div class="detail-section">
+<h4>Strategy / Guide</h4>
+<div class="strategy-text">$strategy</div>
+</div>
+<div class="detail-section">
+<h4>Details</h4>
+<ul>
+<li><strong>Source:</strong> $source</li>
+<li><strong>Quantity:</strong> $quantity</li>
+<li><strong>End Date:</strong> $end_date</li>
+<li><strong>Query:</strong> $query</li>
+<li><strong>Keywords:</strong> $keywords</li>$links
+</ul>
+<a class="visit" href="$url" target="_blank">Visit Website</a>
+</div>
+</div>
+</div>
+""")
+
+REPORT_EMPTY = '<div class="empty-state">No specific developer airdrops found in this run.</div>\n'
+
+REPORT_END = """</div>
+<div class="footer">Generated by Crypto Airdrop Scraper</div>
+</div>
+</body>
+</html>
+"""
+
+def also_listed(item):
+    """Links to the other copies of a merged item"""
+    others = [link for link in item.get('links', []) if link['url'] != item['url']]
+    if not others:
+        return ''
+    anchors = ', '.join(f'<a href="{link["url"]}" target="_blank">{link["source"]}</a>' for link in others)
+    return f'\n<li><strong>Also listed at:</strong> {anchors}</li>'
+
+def report_items(items):
+    """Template values for every item card"""
+    for item in items:
         description = item.get('description', '')
         if len(description) > 300: description = description[:300] + '...'
         
@@ -421,93 +514,84 @@ def generate_html(data):
                 description = description.replace(kw, f"<strong>{kw}</strong>")
                 description = description.replace(kw.capitalize(), f"<strong>{kw.capitalize()}</strong>")
         
-        return f"""
-                <div class="item">
-                    <div class="item-header">
-                        <a href="{item['url']}" target="_blank" class="item-title">{item['title']}</a>
-                        <div class="tags">
-                            <span class="tag tag-source">{item['source']}</span>
-                            {relevance_html}
-                            {quantity_html}
-                            {date_html}
-                            {suspicious_html}
-                        </div>
-                    </div>
-                    
-                    <div style="margin-bottom: 15px; color: #444;">
-                        {description}
-                    </div>
-                    
-                    <div class="item-details">
-                        <div class="detail-section">
-                            <h4>Strategy / Guide</h4>
-                            <div class="strategy-text">{strategy_content}</div>
-                        </div>
-                        <div class="detail-section">
-                            <h4>Details</h4>
-                            <ul style="margin: 0; padding-left: 20px; font-size: 0.9em; color: #444;">
-                                <li><strong>Source:</strong> {item['source']}</li>
-                                <li><strong>Quantity:</strong> {item.get('quantity', 'Unknown')}</li>
-                                <li><strong>End Date:</strong> {item.get('end_date', 'Unknown')}</li>
-                                <li><strong>Query:</strong> {item.get('query', 'N/A')}</li>
-                                <li><strong>Keywords:</strong> {', '.join(item.get('matched_keywords', []))}</li>
-                            </ul>
-                            <div style="margin-top: 15px;">
-                                <a href="{item['url']}" target="_blank" style="display: block; text-align: center; background: #0366d6; color: white; padding: 8px; border-radius: 4px; text-decoration: none; font-weight: 500;">Visit Website</a>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-        """
-
-    if dev_items:
-        for item in dev_items:
-            html_content += render_item(item)
-    else:
-        html_content += '<div class="empty-state">No specific developer airdrops found in this run.</div>'
-
-    html_content += """
-            </div>
-            <div class="footer">
-                Generated by Crypto Airdrop Scraper
-            </div>
-        </div>
-    </body>
-    </html>
-    """
+        quantity = item.get('quantity', 'Unknown')
+        yield {
+            'url': item['url'],
+            'title': item['title'],
+            'source': item['source'],
+            'relevance': f'<span class="tag tag-relevance">Score: {item["relevance_score"]}</span>' if item["relevance_score"] > 0 else '',
+            'quantity_tag': f'<span class="tag tag-quantity">💰 {quantity}</span>' if item.get("quantity") and quantity != "Unknown" else '',
+            'date_tag': f'<span class="tag tag-date">📅 End: {item.get("end_date", "Unknown")}</span>',
+            'suspicious': '<span class="tag tag-suspicious">⚠️ Suspicious</span>' if item.get('is_suspicious') else '',
+            'description': description,
+            'strategy': item.get('strategy') or 'No strategy provided.',
+            'quantity': quantity,
+            'end_date': item.get('end_date', 'Unknown'),
+            'query': item.get('query', 'N/A'),
+            'keywords': ', '.join(item.get('matched_keywords', [])),
+            'links': also_listed(item),
+        }
+
+def render_report(data):
+    items = data.get('items', [])
     
-    with open('./modules/crypto/data.html', 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    # Since we filter strictly, all items are dev items
+    yield REPORT_PAGE.render(stylesheet=stylesheet_link(), timestamp=data.get('timestamp'), count=len(items))
+    if items:
+        yield from REPORT_ITEM.render_all(report_items(items))
+    else:
+        yield REPORT_EMPTY
+    yield REPORT_END
+
+def generate_html(data):
+    """Generate HTML report"""
+    write_html('./modules/crypto/data.html', render_report(data))
+    write_mail_copy('./modules/crypto/data.html', './modules/crypto/mail.html')
     print("✅ HTML Report Generated: data.html")
 
-def main():
-    print("Starting Crypto Airdrop Scraper...")
-    
-    all_items = []
-    
+# DDG throttles bursts of queries, so all DDG sources share one start budget
+DDG_LIMITER = http.HostRateLimiter(rate=1)
+
+def build_sources():
+    """Source registry: every entry runs concurrently under its own deadline"""
     # 1. Search DDG (Specific queries)
     queries = [
         '"airdrop" github contributors',
         '"claim" token github commit',
         '"devdrop" crypto'
     ]
-    for q in queries:
-        try:
-            all_items.extend(search_ddg(q, max_results=2))
-        except Exception as e:
-            print(f"Skipping query {q} due to error: {e}")
-        time.sleep(1)
-        
-    # 2. Scrape airdrops.io (Latest)
-    # Reduced scope for speed
-    # all_items.extend(scrape_airdrops_io_latest())
+    sources = [{
+        'name': f'ddg: {q}',
+        'func': search_ddg,
+        'args': (q,),
+        'kwargs': {'max_results': 2},
+        'timeout': 30,
+        'rate_limiter': DDG_LIMITER,
+        'rate_url': 'https://duckduckgo.com/'
+    } for q in queries]
     
-    # 2.1 Scrape airdrops.io (Search for github/developer)
-    all_items.extend(scrape_airdrops_io_search("github"))
-    # all_items.extend(scrape_airdrops_io_search("developer"))
+    sources += [
+        # 2. Scrape airdrops.io (Latest)
+        {'name': 'airdrops.io: latest', 'func': scrape_airdrops_io_latest, 'timeout': 90},
+        # 2.1 Scrape airdrops.io (Search for github/developer)
+        {'name': 'airdrops.io: github', 'func': scrape_airdrops_io_search, 'args': ("github",), 'timeout': 60},
+        {'name': 'airdrops.io: developer', 'func': scrape_airdrops_io_search, 'args': ("developer",), 'timeout': 60},
+        # 3. Scrape DefiLlama (Claimable)
+        {'name': 'defillama: claimable', 'func': scrape_defillama_airdrops, 'timeout': 45},
+    ]
+    return sources
+
+def main():
+    print("Starting Crypto Airdrop Scraper...")
+    
+    sources = build_sources()
+    results = run_sources(sources)
+    ITEM_STORE.save()
     
-    # 3. Scrape DefiLlama (Claimable)
-    all_items.extend(scrape_defillama_airdrops())
+    # Merge in registry order so the report stays stable between runs
+    all_items = []
+    for source in sources:
+        all_items.extend(results.get(source['name'], []))
     
     # 4. Analyze and Filter
     filtered_items = analyze_and_filter(all_items)
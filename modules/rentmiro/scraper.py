@@ -1,16 +1,61 @@
 import os
 import re
+import sys
 import json
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-def get_api_url():
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from core import http
+from core.parse import make_soup
+from core.embedded import json_after
+from core.jsonstream import iter_records
+from core.history import PriceHistory
+from core.diff import diff_records
+from core.digest import canonical_digest, is_unchanged, write_digest
+from core.render import Template, stylesheet_link, write_html, write_mail_copy
+
+# SightMap-backed buildings to monitor, see properties.json
+REGISTRY_PATH = os.environ.get('RENTMIRO_PROPERTIES', './modules/rentmiro/properties.json')
+OVERVIEW_PATH = './modules/rentmiro/overview.html'
+# Report mailed by the workflow: the changed property's report, or the overview when several changed
+MAIL_PATH = './modules/rentmiro/mail.html'
+
+# Discovered SightMap API URL, reused until the TTL expires or the URL stops working
+ENDPOINT_TTL_SECONDS = 7 * 24 * 3600
+
+# Records streamed out of the SightMap payload
+FLOOR_PLAN_RECORDS = 'data.floor_plans.item'
+UNIT_RECORDS = 'data.units.item'
+
+def load_properties():
+    """
+    Property registry. Each entry has an 'id', a display 'name', the landing
+    page 'url', an optional 'fallback_api_url' and an 'output_dir' for its
+    data.json / data.html and caches (default ./modules/rentmiro/properties/<id>).
+    """
+    with open(REGISTRY_PATH, 'r', encoding='utf-8') as f:
+        properties = json.load(f)
+    for prop in properties:
+        prop.setdefault('fallback_api_url', None)
+        prop.setdefault('output_dir', f"./modules/rentmiro/properties/{prop['id']}")
+        os.makedirs(prop['output_dir'], exist_ok=True)
+        # ETag / Last-Modified validators, restored by CI together with data.json
+        prop['http_cache'] = http.ValidatorCache(output_path(prop, 'http_cache.json'), artifact=output_path(prop, 'data.json'))
+    return properties
+
+def output_path(prop, name):
+    return os.path.join(prop['output_dir'], name)
+
+def get_api_url(prop):
     """
     Dynamically get the API URL by traversing:
     1. Main page -> iframe src
     2. Iframe content -> window.__APP_CONFIG__ -> sightmaps[0].href
+    
+    Returns (api_url, discovered); discovered is False when the property's
+    fallback URL is returned instead.
     """
     headers = {
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36'
@@ -19,108 +64,163 @@ def get_api_url():
     try:
         # Step 1: Get main page
         print("Fetching main page...")
-        main_url = "https://www.rentmiro.com/floorplans"
-        res = requests.get(main_url, headers=headers, timeout=30)
+        main_url = prop['url']
+        res = http.get(main_url, headers=headers, timeout=30)
         res.raise_for_status()
         
         # Step 2: Find iframe src
-        soup = BeautifulSoup(res.text, 'html.parser')
+        soup = make_soup(res.text)
         iframe = soup.find('iframe', src=re.compile(r'sightmap\.com/embed/'))
         
         if not iframe:
             print("Could not find sightmap iframe on main page")
             # Fallback to known ID if scraping fails
-            return "https://sightmap.com/app/api/v1/yjp2k0q9pxl/sightmaps/23140"
+            return prop['fallback_api_url'], False
             
         iframe_src = iframe['src']
         print(f"Found iframe src: {iframe_src}")
         
         # Step 3: Fetch iframe content
-        res_iframe = requests.get(iframe_src, headers=headers, timeout=30)
+        res_iframe = http.get(iframe_src, headers=headers, timeout=30)
         res_iframe.raise_for_status()
         
         # Step 4: Extract config
-        # Try to match the whole line content for APP_CONFIG
-        match = re.search(r'window\.__APP_CONFIG__\s*=\s*({.*})', res_iframe.text)
-        if match:
-            config_str = match.group(1)
-            try:
-                config = json.loads(config_str)
-                if config.get('sightmaps') and len(config['sightmaps']) > 0:
-                    api_url = config['sightmaps'][0]['href']
-                    print(f"Found API URL: {api_url}")
-                    return api_url
-            except json.JSONDecodeError:
-                print("Failed to parse JSON config")
+        try:
+            config = json_after(res_iframe.content, 'window.__APP_CONFIG__')
+            if config and config.get('sightmaps') and len(config['sightmaps']) > 0:
+                api_url = config['sightmaps'][0]['href']
+                print(f"Found API URL: {api_url}")
+                return api_url, True
+        except ValueError:
+            print("Failed to parse JSON config")
                 
         print("Could not extract API URL from iframe content")
-        return "https://sightmap.com/app/api/v1/yjp2k0q9pxl/sightmaps/23140"
+        return prop['fallback_api_url'], False
         
     except Exception as e:
         print(f"Error finding API URL: {e}")
-        return "https://sightmap.com/app/api/v1/yjp2k0q9pxl/sightmaps/23140"
+        return prop['fallback_api_url'], False
 
-def scrape_rentmiro_data():
-    """Scrape data from RentMiro (via SightMap API)"""
-    api_url = get_api_url()
-    
+def load_cached_api_url(prop):
+    """Return the cached API URL if it is still within its TTL"""
+    cache_path = output_path(prop, 'endpoint_cache.json')
+    try:
+        if os.path.exists(cache_path):
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if time.time() - cached.get('discovered_at', 0) < ENDPOINT_TTL_SECONDS:
+                return cached.get('api_url')
+            print("Cached API URL expired, rediscovering")
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable endpoint cache: {e}")
+    return None
+
+def save_cached_api_url(prop, api_url):
+    """Persist a freshly discovered API URL"""
+    with open(output_path(prop, 'endpoint_cache.json'), 'w', encoding='utf-8') as f:
+        json.dump({'api_url': api_url, 'discovered_at': time.time()}, f, indent=2)
+
+class StaleEndpointError(Exception):
+    """The API URL answered with a 4xx or a non-JSON body"""
+
+def fetch_api_data(api_url, cache):
+    """Fetch and process the SightMap payload as it streams in, returns (data, status)"""
     headers = {
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36',
         'Accept': 'application/json'
     }
     
+    print(f"Fetching data from API: {api_url}")
+    res = http.conditional_get(api_url, cache, headers=headers, timeout=30, stream=True)
     try:
-        print(f"Fetching data from API: {api_url}")
-        res = requests.get(api_url, headers=headers, timeout=30)
+        if res.status_code == 304:
+            print("API data not modified (304)")
+            return None, 304
+        if 400 <= res.status_code < 500:
+            raise StaleEndpointError(f"API returned {res.status_code}")
         res.raise_for_status()
         
-        data = res.json()
+        try:
+            records = iter_records(res, (FLOOR_PLAN_RECORDS, UNIT_RECORDS))
+            return process_api_records(records, api_url), 200
+        except ValueError:
+            raise StaleEndpointError("API returned invalid JSON")
+    finally:
+        res.close()
+
+def scrape_rentmiro_data(prop):
+    """Scrape data from one property (via SightMap API)"""
+    try:
+        api_url = load_cached_api_url(prop)
+        if api_url:
+            try:
+                data, status = fetch_api_data(api_url, prop['http_cache'])
+            except StaleEndpointError as e:
+                print(f"Cached API URL is stale ({e}), rediscovering")
+                api_url = None
+        
+        if not api_url:
+            api_url, discovered = get_api_url(prop)
+            if not api_url:
+                raise RuntimeError("No API URL found and no fallback configured")
+            if discovered:
+                save_cached_api_url(prop, api_url)
+            data, status = fetch_api_data(api_url, prop['http_cache'])
         
-        # Process the data
-        processed_data = process_api_data(data, api_url)
-        return processed_data, 200
+        return data, status
         
     except Exception as e:
         return {'error': str(e), 'timestamp': datetime.now().isoformat()}, 500
 
-def process_api_data(api_data, source_url):
-    """Process the raw API data into a cleaner format"""
-    
-    # Create lookup for floor plans
+def process_api_records(records, source_url):
+    """
+    Join streamed (prefix, record) pairs into the report format.
+    Units without available_on are dropped as they are read, and only the
+    fields we keep are buffered until every floor plan has been seen.
+    """
     floor_plans = {}
-    if 'data' in api_data and 'floor_plans' in api_data['data']:
-        for fp in api_data['data']['floor_plans']:
-            floor_plans[fp['id']] = {
-                'name': fp.get('name'),
-                'beds': fp.get('bedroom_count'),
-                'baths': fp.get('bathroom_count'),
-                'label': fp.get('filter_label'),
-                'image_url': fp.get('image_url')
+    available = []
+    for prefix, record in records:
+        if prefix == FLOOR_PLAN_RECORDS:
+            # Create lookup for floor plans
+            floor_plans[record['id']] = {
+                'name': record.get('name'),
+                'beds': record.get('bedroom_count'),
+                'baths': record.get('bathroom_count'),
+                'label': record.get('filter_label'),
+                'image_url': record.get('image_url')
             }
-            
-    units = []
-    if 'data' in api_data and 'units' in api_data['data']:
-        for unit in api_data['data']['units']:
+        elif record.get('available_on'):
             # Only include available units
-            if unit.get('available_on'):
-                fp_id = unit.get('floor_plan_id')
-                fp_info = floor_plans.get(fp_id, {})
-                
-                unit_info = {
-                    'unit_number': unit.get('unit_number'),
-                    'display_unit': unit.get('display_unit_number'),
-                    'area': unit.get('area'),
-                    'price': unit.get('price'),
-                    'display_price': unit.get('display_price'),
-                    'available_on': unit.get('available_on'),
-                    'floor_plan': fp_info.get('name', 'Unknown'),
-                    'beds': fp_info.get('beds'),
-                    'baths': fp_info.get('baths'),
-                    'floor_plan_image': fp_info.get('image_url'),
-                    'floor': unit.get('floor_id'),
-                    'price_change': 0  # Default no change
-                }
-                units.append(unit_info)
+            available.append({
+                'unit_number': record.get('unit_number'),
+                'display_unit': record.get('display_unit_number'),
+                'area': record.get('area'),
+                'price': record.get('price'),
+                'display_price': record.get('display_price'),
+                'available_on': record.get('available_on'),
+                'floor_plan_id': record.get('floor_plan_id'),
+                'floor': record.get('floor_id')
+            })
+    
+    units = []
+    for unit in available:
+        fp_info = floor_plans.get(unit.pop('floor_plan_id'), {})
+        unit_info = {
+            'unit_number': unit['unit_number'],
+            'display_unit': unit['display_unit'],
+            'area': unit['area'],
+            'price': unit['price'],
+            'display_price': unit['display_price'],
+            'available_on': unit['available_on'],
+            'floor_plan': fp_info.get('name', 'Unknown'),
+            'beds': fp_info.get('beds'),
+            'baths': fp_info.get('baths'),
+            'floor_plan_image': fp_info.get('image_url'),
+            'floor': unit['floor'],
+            'price_change': 0  # Default no change
+        }
+        units.append(unit_info)
     
     # Sort by price (low to high)
     units.sort(key=lambda x: x['price'] if x['price'] else 999999)
@@ -134,11 +234,11 @@ def process_api_data(api_data, source_url):
     
     return result
 
-def get_previous_data():
+def get_previous_data(prop):
     """Get previous data for comparison"""
     try:
-        if os.path.exists('./modules/rentmiro/data.json'):
-            with open('./modules/rentmiro/data.json', 'r', encoding='utf-8') as f:
+        if os.path.exists(output_path(prop, 'data.json')):
+            with open(output_path(prop, 'data.json'), 'r', encoding='utf-8') as f:
                 return json.load(f)
     except:
         pass
@@ -159,42 +259,49 @@ def analyze_changes(current_data, previous_data):
         changes['summary_text'] = "首次抓取数据，无法比较变化"
         return changes
         
+    current_units = current_data['units']
+    previous_units = previous_data['units']
+    diff = diff_records(previous_units, current_units, 'unit_number',
+                        fields=('price', 'available_on'), numeric=('price',))
+    
+    # Render the index sets into the report structures
     summary_lines = []
+    for i in diff['added']:
+        unit = current_units[i]
+        desc = f"{unit['display_unit']} ({unit['floor_plan']}) - {unit['display_price']}"
+        changes['added'].append(unit)
+        summary_lines.append(f"🏠 新增: {desc}")
+        unit['is_new'] = True
     
-    # Create maps for easier comparison
-    current_units = {u['unit_number']: u for u in current_data['units']}
-    previous_units = {u['unit_number']: u for u in previous_data['units']}
+    cur_idx, prev_idx = diff['changed']['price']
+    for i, j, delta in zip(cur_idx, prev_idx, diff['delta']['price']):
+        unit, prev_unit = current_units[i], previous_units[j]
+        if delta != delta:
+            # A price set or withdrawn has no delta: no arrow, no zero drop
+            label = "定价" if unit.get('price') is not None else "撤价"
+            desc = f"{unit['display_unit']}: {prev_unit['display_price']} -> {unit['display_price']}"
+            changes['price_changed'].append({'unit': unit, 'diff': None, 'desc': f"{desc} ({label})"})
+            summary_lines.append(f"💰 {label}: {desc}")
+            continue
+        change = int(delta) if float(delta).is_integer() else float(delta)
+        unit['price_change'] = change
+        symbol = "🔺" if change > 0 else "🔻"
+        desc = f"{unit['display_unit']}: {prev_unit['display_price']} -> {unit['display_price']} ({symbol}{abs(change)})"
+        changes['price_changed'].append({'unit': unit, 'diff': change, 'desc': desc})
+        summary_lines.append(f"💰 调价: {desc}")
     
-    # Check for new units
-    for unit_num, unit in current_units.items():
-        if unit_num not in previous_units:
-            desc = f"{unit['display_unit']} ({unit['floor_plan']}) - {unit['display_price']}"
-            changes['added'].append(unit)
-            summary_lines.append(f"🏠 新增: {desc}")
-            unit['is_new'] = True
-        else:
-            # Check for price changes
-            prev_unit = previous_units[unit_num]
-            if unit['price'] != prev_unit['price']:
-                diff = unit['price'] - prev_unit['price']
-                unit['price_change'] = diff
-                symbol = "🔺" if diff > 0 else "🔻"
-                desc = f"{unit['display_unit']}: {prev_unit['display_price']} -> {unit['display_price']} ({symbol}{abs(diff)})"
-                changes['price_changed'].append({'unit': unit, 'diff': diff, 'desc': desc})
-                summary_lines.append(f"💰 调价: {desc}")
-            
-            # Check for availability date changes
-            if unit['available_on'] != prev_unit['available_on']:
-                 desc = f"{unit['display_unit']}: {prev_unit['available_on']} -> {unit['available_on']}"
-                 changes['date_changed'].append({'unit': unit, 'old_date': prev_unit['available_on'], 'new_date': unit['available_on']})
-                 summary_lines.append(f"📅 日期: {desc}")
-
-    # Check for removed units
-    for unit_num, unit in previous_units.items():
-        if unit_num not in current_units:
-            desc = f"{unit['display_unit']} ({unit['floor_plan']})"
-            changes['removed'].append(unit)
-            summary_lines.append(f"❌ 下架: {desc}")
+    cur_idx, prev_idx = diff['changed']['available_on']
+    for i, j in zip(cur_idx, prev_idx):
+        unit, prev_unit = current_units[i], previous_units[j]
+        desc = f"{unit['display_unit']}: {prev_unit['available_on']} -> {unit['available_on']}"
+        changes['date_changed'].append({'unit': unit, 'old_date': prev_unit['available_on'], 'new_date': unit['available_on']})
+        summary_lines.append(f"📅 日期: {desc}")
+    
+    for j in diff['removed']:
+        unit = previous_units[j]
+        desc = f"{unit['display_unit']} ({unit['floor_plan']})"
+        changes['removed'].append(unit)
+        summary_lines.append(f"❌ 下架: {desc}")
             
     if summary_lines:
         changes['has_changes'] = True
@@ -202,272 +309,316 @@ def analyze_changes(current_data, previous_data):
         
     return changes
 
-def save_data(data, status_code):
-    """Save data and generate report"""
+def save_data(data, status_code, prop):
+    """Save data and generate report; returns True when the report was regenerated"""
+    if status_code == 304:
+        print("📊 数据未修改 (304)，跳过解析、对比和报告生成")
+        return False
     if status_code != 200:
         print(f"❌ 抓取失败: {data.get('error')}")
-        return
+        return False
 
     print("=== 开始保存数据流程 ===")
     
+    # Same content as last time: nothing to load, diff or rewrite
+    digest = canonical_digest(data)
+    if is_unchanged(output_path(prop, 'data.json'), digest):
+        print("📊 数据内容摘要未变化，跳过对比和报告生成")
+        return False
+    
     # Get previous data
-    previous_data = get_previous_data()
+    previous_data = get_previous_data(prop)
     
     # Analyze changes
     changes = analyze_changes(data, previous_data)
     print(f"📈 变化信息:\n{changes['summary_text']}")
     
     # Save current data
-    with open('./modules/rentmiro/data.json', 'w', encoding='utf-8') as f:
+    with open(output_path(prop, 'data.json'), 'w', encoding='utf-8') as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
+    write_digest(output_path(prop, 'data.json'), digest)
+    
+    # Append price / availability changes to the long-term history
+    rows = PriceHistory(prop['output_dir']).append(data['units'], datetime.fromisoformat(data['timestamp']))
+    print(f"🗄️ 价格历史新增 {rows} 条记录")
         
     # Generate HTML report
-    generate_html(data, changes)
+    generate_html(data, changes, prop)
     
     print("=== 数据保存流程完成 ===")
+    return True
 
-def generate_html(data, changes):
-    """Generate HTML report"""
+REPORT_PAGE = Template("""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>$name 公寓监控</title>
+$stylesheet
+<script>
+function filterTable() {
+    // Get selected beds
+    const bedCheckboxes = document.querySelectorAll('input[name="bedFilter"]:checked');
+    const selectedBeds = Array.from(bedCheckboxes).map(cb => cb.value);
     
-    # Build changes HTML
-    changes_html = ""
-    if changes['has_changes']:
-        changes_html = '<div class="changes-container">'
+    const priceFilter = document.getElementById('priceFilter').value;
+    const dateFilter = document.getElementById('dateFilter').value;
+    const rows = document.querySelectorAll('tbody tr');
+    
+    rows.forEach(row => {
+        const beds = row.getAttribute('data-beds');
+        const price = parseInt(row.getAttribute('data-price'));
+        const availableDate = row.getAttribute('data-available');
         
-        if changes['added']:
-            changes_html += '<div class="change-section added"><h3>🏠 新增房源</h3><ul>'
-            for unit in changes['added']:
-                changes_html += f"<li><strong>{unit['display_unit']}</strong> - {unit['floor_plan']} - {unit['display_price']} - {unit['available_on']}</li>"
-            changes_html += '</ul></div>'
-            
-        if changes['removed']:
-            changes_html += '<div class="change-section removed"><h3>❌ 下架房源</h3><ul>'
-            for unit in changes['removed']:
-                changes_html += f"<li><strong>{unit['display_unit']}</strong> - {unit['floor_plan']} - {unit['display_price']}</li>"
-            changes_html += '</ul></div>'
-            
-        if changes['price_changed']:
-            changes_html += '<div class="change-section price-changed"><h3>💰 价格变动</h3><ul>'
-            for item in changes['price_changed']:
-                changes_html += f"<li>{item['desc']}</li>"
-            changes_html += '</ul></div>'
-            
-        if changes['date_changed']:
-            changes_html += '<div class="change-section date-changed"><h3>📅 日期变动</h3><ul>'
-            for item in changes['date_changed']:
-                item_unit = item['unit']
-                changes_html += f"<li><strong>{item_unit['display_unit']}</strong>: {item['old_date']} -> {item['new_date']}</li>"
-            changes_html += '</ul></div>'
-            
-        changes_html += '</div>'
+        let show = true;
+        
+        // Bed filter (if any selected)
+        if (selectedBeds.length > 0 && !selectedBeds.includes(beds)) {
+            show = false;
+        }
+        
+        // Price filter
+        if (priceFilter && price > parseInt(priceFilter)) {
+            show = false;
+        }
+        
+        // Date filter (Move-in date)
+        // Logic: If I want to move in on X, the unit must be available on or before X.
+        if (dateFilter) {
+            if (availableDate > dateFilter) {
+                show = false;
+            }
+        }
+        
+        row.style.display = show ? '' : 'none';
+    });
     
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <title>RentMiro 公寓监控</title>
-        <style>
-            body {{ font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif; margin: 20px; color: #333; }}
-            .container {{ max-width: 1200px; margin: 0 auto; }}
-            .header {{ background: #2c3e50; color: white; padding: 20px; border-radius: 8px 8px 0 0; }}
-            .header a {{ color: white; text-decoration: none; }}
-            .header a:hover {{ text-decoration: underline; }}
-            .summary {{ background: #ecf0f1; padding: 15px; margin-bottom: 20px; border-radius: 0 0 8px 8px; }}
-            
-            /* Changes Section */
-            .changes-container {{ margin-bottom: 30px; display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 20px; }}
-            .change-section {{ padding: 15px; border-radius: 8px; border: 1px solid #ddd; }}
-            .change-section h3 {{ margin-top: 0; border-bottom: 1px solid rgba(0,0,0,0.1); padding-bottom: 10px; }}
-            .change-section ul {{ padding-left: 20px; margin-bottom: 0; }}
-            .change-section li {{ margin-bottom: 5px; }}
-            
-            .added {{ background-color: #e8f5e9; border-color: #a5d6a7; color: #2e7d32; }}
-            .removed {{ background-color: #ffebee; border-color: #ef9a9a; color: #c62828; }}
-            .price-changed {{ background-color: #fff8e1; border-color: #ffe082; color: #f57f17; }}
-            .date-changed {{ background-color: #e3f2fd; border-color: #90caf9; color: #1565c0; }}
-            
-            /* Controls */
-            .controls {{ margin: 20px 0; padding: 15px; background: #f8f9fa; border-radius: 8px; display: flex; gap: 20px; align-items: center; flex-wrap: wrap; }}
-            .control-group {{ display: flex; align-items: center; gap: 10px; margin-right: 20px; }}
-            select, input {{ padding: 8px; border: 1px solid #ddd; border-radius: 4px; }}
-            
-            table {{ width: 100%; border-collapse: collapse; margin-top: 20px; box-shadow: 0 1px 3px rgba(0,0,0,0.1); }}
-            th, td {{ padding: 12px 15px; text-align: left; border-bottom: 1px solid #ddd; vertical-align: middle; }}
-            th {{ background-color: #f8f9fa; font-weight: 600; color: #2c3e50; position: sticky; top: 0; }}
-            tr:hover {{ background-color: #f5f5f5; }}
-            
-            .price {{ font-weight: bold; }}
-            .price-up {{ color: #e74c3c; }}
-            .price-down {{ color: #27ae60; }}
-            .price-same {{ color: #2c3e50; }}
-            
-            .unit-badge {{ background: #3498db; color: white; padding: 4px 8px; border-radius: 4px; font-weight: bold; display: inline-block; }}
-            .new-badge {{ background: #2ecc71; color: white; padding: 2px 6px; border-radius: 4px; font-size: 0.8em; margin-left: 5px; }}
-            
-            .floor-plan-img {{ width: 100px; height: auto; border-radius: 4px; cursor: pointer; transition: transform 0.2s; }}
-            .floor-plan-img:hover {{ transform: scale(2.5); z-index: 100; position: relative; box-shadow: 0 5px 15px rgba(0,0,0,0.3); }}
-            
-            .footer {{ margin-top: 30px; text-align: center; color: #7f8c8d; font-size: 0.9em; }}
-        </style>
-        <script>
-            function filterTable() {{
-                // Get selected beds
-                const bedCheckboxes = document.querySelectorAll('input[name="bedFilter"]:checked');
-                const selectedBeds = Array.from(bedCheckboxes).map(cb => cb.value);
-                
-                const priceFilter = document.getElementById('priceFilter').value;
-                const dateFilter = document.getElementById('dateFilter').value;
-                const rows = document.querySelectorAll('tbody tr');
-                
-                rows.forEach(row => {{
-                    const beds = row.getAttribute('data-beds');
-                    const price = parseInt(row.getAttribute('data-price'));
-                    const availableDate = row.getAttribute('data-available');
-                    
-                    let show = true;
-                    
-                    // Bed filter (if any selected)
-                    if (selectedBeds.length > 0 && !selectedBeds.includes(beds)) {{
-                        show = false;
-                    }}
-                    
-                    // Price filter
-                    if (priceFilter && price > parseInt(priceFilter)) {{
-                        show = false;
-                    }}
-                    
-                    // Date filter (Move-in date)
-                    // Logic: If I want to move in on X, the unit must be available on or before X.
-                    if (dateFilter) {{
-                        if (availableDate > dateFilter) {{
-                            show = false;
-                        }}
-                    }}
-                    
-                    row.style.display = show ? '' : 'none';
-                }});
-                
-                // Update count
-                const visibleCount = Array.from(rows).filter(r => r.style.display !== 'none').length;
-                document.getElementById('visibleCount').textContent = visibleCount;
-            }}
-            
-            // Set default date to empty (show all)
-            window.onload = function() {{
-                // const today = new Date().toISOString().split('T')[0];
-                // document.getElementById('dateFilter').value = today;
-                filterTable();
-            }}
-        </script>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <div style="display:flex; justify-content:space-between; align-items:center;">
-                    <h1 style="margin:0"><a href="https://www.rentmiro.com/floorplans" target="_blank" style="color:white; text-decoration:none;">RentMiro 公寓监控 🔗</a></h1>
-                    <a href="../../index.html" style="color:white; text-decoration:none; background:rgba(255,255,255,0.2); padding:5px 10px; border-radius:4px; font-size:0.9em;">🏠 返回首页</a>
-                </div>
-                <p style="margin:10px 0 0 0; opacity: 0.8">更新时间: {data.get('timestamp')}</p>
-            </div>
-            
-            <div class="summary">
-                <strong>当前可用房源:</strong> {data.get('total_units')} 套
-            </div>
-            
-            {changes_html}
-            
-            <div class="controls">
-                <div class="control-group">
-                    <label>户型筛选:</label>
-                    <div style="display: flex; gap: 10px; background: white; padding: 5px 10px; border: 1px solid #ddd; border-radius: 4px;">
-                        <label><input type="checkbox" name="bedFilter" value="0" onchange="filterTable()"> Studio</label>
-                        <label><input type="checkbox" name="bedFilter" value="1" onchange="filterTable()"> 1B</label>
-                        <label><input type="checkbox" name="bedFilter" value="2" onchange="filterTable()"> 2B</label>
-                        <label><input type="checkbox" name="bedFilter" value="3" onchange="filterTable()"> 3B</label>
-                    </div>
-                </div>
-                <div class="control-group">
-                    <label>最高价格:</label>
-                    <input type="number" id="priceFilter" placeholder="输入最高预算" onkeyup="filterTable()" style="width: 100px;">
-                </div>
-                <div class="control-group">
-                    <label>期望入住日期:</label>
-                    <input type="date" id="dateFilter" onchange="filterTable()">
-                </div>
-                <div class="control-group" style="margin-left: auto; color: #666;">
-                    显示: <span id="visibleCount">{len(data.get('units', []))}</span> / {len(data.get('units', []))}
-                </div>
-            </div>
-            
-            <table>
-                <thead>
-                    <tr>
-                        <th>房间号</th>
-                        <th>户型</th>
-                        <th>户型图</th>
-                        <th>面积 (sq.ft)</th>
-                        <th>价格</th>
-                        <th>可用时间</th>
-                    </tr>
-                </thead>
-                <tbody>
-    """
+    // Update count
+    const visibleCount = Array.from(rows).filter(r => r.style.display !== 'none').length;
+    document.getElementById('visibleCount').textContent = visibleCount;
+}
+
+// Set default date to empty (show all)
+window.onload = function() {
+    filterTable();
+}
+</script>
+</head>
+<body class="wide">
+<div class="container">
+<div class="header">
+<h1><a href="$url" target="_blank">$name 公寓监控 🔗</a></h1>
+<a class="home" href="$home_link">🏠 返回首页</a>
+<p class="subtitle">更新时间: $timestamp</p>
+</div>
+<div class="summary"><strong>当前可用房源:</strong> $total_units 套</div>
+$changes
+<div class="controls">
+<div class="control-group">
+<label>户型筛选:</label>
+<div class="control-options">
+<label><input type="checkbox" name="bedFilter" value="0" onchange="filterTable()"> Studio</label>
+<label><input type="checkbox" name="bedFilter" value="1" onchange="filterTable()"> 1B</label>
+<label><input type="checkbox" name="bedFilter" value="2" onchange="filterTable()"> 2B</label>
+<label><input type="checkbox" name="bedFilter" value="3" onchange="filterTable()"> 3B</label>
+</div>
+</div>
+<div class="control-group">
+<label>最高价格:</label>
+<input type="number" id="priceFilter" placeholder="输入最高预算" onkeyup="filterTable()" style="width: 100px;">
+</div>
+<div class="control-group">
+<label>期望入住日期:</label>
+<input type="date" id="dateFilter" onchange="filterTable()">
+</div>
+<div class="control-group control-count">显示: <span id="visibleCount">$unit_count</span> / $unit_count</div>
+</div>
+<table>
+<thead><tr><th>房间号</th><th>户型</th><th>户型图</th><th>面积 (sq.ft)</th><th>价格</th><th>可用时间</th></tr></thead>
+<tbody>
+""")
+
+REPORT_ROW = Template(
+    '<tr data-beds="$beds" data-price="$price" data-available="$available_on">'
+    '<td><span class="unit-badge">$display_unit</span>$new_badge</td>'
+    '<td><strong>$floor_plan</strong><br><span class="muted">${beds}B${baths}B</span></td>'
+    '<td>$image</td><td>$area</td>'
+    '<td class="$price_class">$display_price$price_arrow</td>'
+    '<td>$available_on</td></tr>\n'
+)
+
+REPORT_END = """</tbody>
+</table>
+<div class="footer">Generated by RentMiro Scraper</div>
+</div>
+</body>
+</html>
+"""
+
+def render_changes(changes):
+    """Change summary boxes, empty when nothing changed"""
+    if not changes['has_changes']:
+        return ''
+    parts = ['<div class="changes-container">']
     
-    for unit in data.get('units', []):
+    if changes['added']:
+        parts.append('<div class="change-section added"><h3>🏠 新增房源</h3><ul>')
+        parts.extend(f"<li><strong>{unit['display_unit']}</strong> - {unit['floor_plan']} - {unit['display_price']} - {unit['available_on']}</li>" for unit in changes['added'])
+        parts.append('</ul></div>')
+        
+    if changes['removed']:
+        parts.append('<div class="change-section removed"><h3>❌ 下架房源</h3><ul>')
+        parts.extend(f"<li><strong>{unit['display_unit']}</strong> - {unit['floor_plan']} - {unit['display_price']}</li>" for unit in changes['removed'])
+        parts.append('</ul></div>')
+        
+    if changes['price_changed']:
+        parts.append('<div class="change-section price-changed"><h3>💰 价格变动</h3><ul>')
+        parts.extend(f"<li>{item['desc']}</li>" for item in changes['price_changed'])
+        parts.append('</ul></div>')
+        
+    if changes['date_changed']:
+        parts.append('<div class="change-section date-changed"><h3>📅 日期变动</h3><ul>')
+        parts.extend(f"<li><strong>{item['unit']['display_unit']}</strong>: {item['old_date']} -> {item['new_date']}</li>" for item in changes['date_changed'])
+        parts.append('</ul></div>')
+        
+    parts.append('</div>')
+    return ''.join(parts)
+
+def report_rows(units):
+    """Template values for every unit row"""
+    for unit in units:
         # Determine price class and arrow
-        price_class = "price-same"
-        price_arrow = ""
         change = unit.get('price_change', 0)
-        
         if change > 0:
-            price_class = "price-up"
-            price_arrow = f" <span style='font-size:0.8em'>▲{change}</span>"
+            price_class, price_arrow = "price-up", f' <span class="delta">▲{change}</span>'
         elif change < 0:
-            price_class = "price-down"
-            price_arrow = f" <span style='font-size:0.8em'>▼{abs(change)}</span>"
-            
-        new_badge = '<span class="new-badge">NEW</span>' if unit.get('is_new') else ''
+            price_class, price_arrow = "price-down", f' <span class="delta">▼{abs(change)}</span>'
+        else:
+            price_class, price_arrow = "price-same", ''
         
         # Floor plan image
-        img_html = f'<img src="{unit.get("floor_plan_image")}" class="floor-plan-img" loading="lazy" alt="Floor Plan">' if unit.get("floor_plan_image") else '<span style="color:#ccc">无图</span>'
-        
-        html_content += f"""
-                    <tr data-beds="{unit.get('beds')}" data-price="{unit.get('price')}" data-available="{unit.get('available_on')}">
-                        <td>
-                            <span class="unit-badge">{unit.get('display_unit')}</span>
-                            {new_badge}
-                        </td>
-                        <td>
-                            <strong>{unit.get('floor_plan')}</strong><br>
-                            <span style="color:#666; font-size:0.9em">{unit.get('beds')}B{unit.get('baths')}B</span>
-                        </td>
-                        <td>{img_html}</td>
-                        <td>{unit.get('area')}</td>
-                        <td class="{price_class}">
-                            {unit.get('display_price')}
-                            {price_arrow}
-                        </td>
-                        <td>{unit.get('available_on')}</td>
-                    </tr>
-        """
-        
-    html_content += """
-                </tbody>
-            </table>
-            
-            <div class="footer">
-                Generated by RentMiro Scraper
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-    
-    with open('./modules/rentmiro/data.html', 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    print("✅ HTML报告已生成: data.html")
+        image = unit.get("floor_plan_image")
+        yield dict(
+            beds=unit.get('beds'),
+            baths=unit.get('baths'),
+            price=unit.get('price'),
+            available_on=unit.get('available_on'),
+            display_unit=unit.get('display_unit'),
+            display_price=unit.get('display_price'),
+            floor_plan=unit.get('floor_plan'),
+            area=unit.get('area'),
+            new_badge='<span class="new-badge">NEW</span>' if unit.get('is_new') else '',
+            image=f'<img src="{image}" class="floor-plan-img" loading="lazy" alt="Floor Plan">' if image else '<span class="no-image">无图</span>',
+            price_class=price_class,
+            price_arrow=price_arrow,
+        )
+
+def render_report(data, changes, prop):
+    """Report chunks: page head, one chunk per unit row, page end"""
+    units = data.get('units', [])
+    yield REPORT_PAGE.render(
+        name=prop['name'],
+        url=prop['url'],
+        home_link=os.path.relpath('./index.html', prop['output_dir']),
+        stylesheet=stylesheet_link(),
+        timestamp=data.get('timestamp'),
+        total_units=data.get('total_units'),
+        unit_count=len(units),
+        changes=render_changes(changes),
+    )
+    yield from REPORT_ROW.render_all(report_rows(units))
+    yield REPORT_END
+
+def generate_html(data, changes, prop):
+    """Generate HTML report"""
+    write_html(output_path(prop, 'data.html'), render_report(data, changes, prop))
+    print(f"✅ HTML报告已生成: {output_path(prop, 'data.html')}")
+
+def cheapest_by_floor_plan(properties):
+    """Cheapest available unit of every floor plan across all properties, read from their data.json"""
+    cheapest = {}
+    for prop in properties:
+        data = get_previous_data(prop)
+        for unit in (data or {}).get('units', []):
+            if not unit.get('price'):
+                continue
+            key = (prop['id'], unit['floor_plan'])
+            if key not in cheapest or unit['price'] < cheapest[key][1]['price']:
+                cheapest[key] = (prop, unit)
+    return sorted(cheapest.values(), key=lambda x: (x[1].get('beds') or 0, x[1]['price']))
+
+OVERVIEW_PAGE = Template("""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>SightMap 公寓总览</title>
+$stylesheet
+</head>
+<body class="wide">
+<div class="container">
+<div class="header">
+<h1>SightMap 公寓总览</h1>
+<a class="home" href="../../index.html">🏠 返回首页</a>
+</div>
+<div class="summary"><strong>监控楼盘:</strong> $count 个 · <strong>更新时间:</strong> $timestamp</div>
+<table>
+<thead><tr><th>楼盘</th><th>户型</th><th>房型</th><th>最低价房间</th><th>面积 (sq.ft)</th><th>价格</th><th>可用时间</th></tr></thead>
+<tbody>
+""")
+
+OVERVIEW_ROW = Template(
+    '<tr><td><a href="$report_link">$property</a></td><td><strong>$floor_plan</strong></td>'
+    '<td>${beds}B${baths}B</td><td><span class="unit-badge">$display_unit</span></td>'
+    '<td>$area</td><td class="price">$display_price</td><td>$available_on</td></tr>\n'
+)
+
+OVERVIEW_END = """</tbody>
+</table>
+</div>
+</body>
+</html>
+"""
+
+def render_overview(properties):
+    yield OVERVIEW_PAGE.render(stylesheet=stylesheet_link(), count=len(properties), timestamp=datetime.now().isoformat())
+    yield from OVERVIEW_ROW.render_all(dict(
+        unit,
+        property=prop['name'],
+        report_link=os.path.relpath(output_path(prop, 'data.html'), os.path.dirname(OVERVIEW_PATH)),
+    ) for prop, unit in cheapest_by_floor_plan(properties))
+    yield OVERVIEW_END
+
+def generate_overview(properties):
+    """Cross-property view: cheapest available unit per floor plan"""
+    write_html(OVERVIEW_PATH, render_overview(properties))
+    print(f"✅ 总览报告已生成: {OVERVIEW_PATH}")
+
+def write_mail(changed):
+    """Copy the report to mail to MAIL_PATH: the changed property's own report, or the overview"""
+    if len(changed) == 1:
+        source = output_path(changed[0], 'data.html')
+    else:
+        source = OVERVIEW_PATH
+    write_mail_copy(source, MAIL_PATH)
+    print(f"📧 邮件报告: {source}")
+
+def run_property(prop):
+    """Scrape, diff and render one property; returns (status, report regenerated)"""
+    data, status = scrape_rentmiro_data(prop)
+    changed = save_data(data, status, prop)
+    if status == 200:
+        prop['http_cache'].save()
+    return status, changed
 
 if __name__ == "__main__":
-    data, status = scrape_rentmiro_data()
-    save_data(data, status)
+    properties = load_properties()
+    
+    # Properties share the pooled session, so the run takes as long as the slowest one
+    with ThreadPoolExecutor(max_workers=http.DEFAULT_WORKERS) as executor:
+        results = list(executor.map(run_property, properties))
+    statuses = [status for status, _ in results]
+    changed = [prop for prop, (_, report_changed) in zip(properties, results) if report_changed]
+    
+    if len(properties) > 1 and 200 in statuses:
+        generate_overview(properties)
+    if changed:
+        write_mail(changed)
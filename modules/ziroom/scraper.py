@@ -1,120 +1,336 @@
-import os, re
-import requests
-from bs4 import BeautifulSoup
+import os, re, sys, json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit
 
-def query(uri, keyword):
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from core import http
+from core.parse import make_soup, SoupStrainer
+from core.match import KeywordMatcher
+from core.render import Template, stylesheet_link, write_html, write_mail_copy
+from core.snapshot import atomic_write
+
+# ETag / Last-Modified validators, restored by CI together with data.html
+HTTP_CACHE = http.ValidatorCache('modules/ziroom/http_cache.json', artifact='modules/ziroom/data.html')
+
+# Listing titles are the only part of the page we read
+HOUSE_TITLES = SoupStrainer('h5', attrs={'class': 'title sign'})
+
+# Every listing seen so far: {id: {title, href, uris, first_seen, last_seen}}
+INDEX_PATH = 'modules/ziroom/index.json'
+MAX_PAGES = int(os.environ.get('ZIROOM_MAX_PAGES', 10))
+PREFETCH_PAGES = int(os.environ.get('ZIROOM_PREFETCH', 3))
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_12_4) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/57.0.2987.133 Safari/537.36'
+}
+
+def load_watches():
+    """
+    Watches to run, as a list of {'uri': ..., 'keywords': [...]}.
+    ZIROOM_CONFIG points to a JSON file holding such a list; without it the
+    single URI / KEYWORD environment pair is used.
+    """
+    config_path = os.environ.get('ZIROOM_CONFIG')
+    if config_path:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        return [{'uri': e['uri'], 'keywords': [k for k in e.get('keywords', []) if k]} for e in entries]
+    
+    uri = os.environ.get('URI')
     if not uri:
-        print("URI environment variable not set")
-        return None, []
-        
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_12_4) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/57.0.2987.133 Safari/537.36'
-    }
+        return []
+    keyword = os.environ.get('KEYWORD')
+    return [{'uri': uri, 'keywords': [keyword] if keyword else []}]
+
+def fetch_pages(uris):
+    """
+    Fetch the first page of every search concurrently. Returns ({uri: html}, status)
+    where status is 304 when no page changed since the previous report, 200 on
+    success, or None on failure.
+    """
+    responses = http.fetch_all([page_url(uri, 1) for uri in uris], cache=HTTP_CACHE, headers=HEADERS)
+    for uri, (res, error) in zip(uris, responses):
+        if error:
+            print(f"Error querying ziroom {uri}: {error}")
+            return {}, None
+        if res.status_code not in (200, 304):
+            print(f"Failed to fetch data from {uri}: {res.status_code}")
+            return {}, None
     
+    if all(res.status_code == 304 for res, _ in responses):
+        print("Pages not modified (304), keeping previous report")
+        return {}, 304
+    
+    # The report is rebuilt as a whole, so unchanged pages are fetched in full too
+    pages = {uri: res.text for uri, (res, _) in zip(uris, responses) if res.status_code == 200}
+    unchanged = [uri for uri in uris if uri not in pages]
+    refetched = http.fetch_all([page_url(uri, 1) for uri in unchanged], headers=HEADERS)
+    for uri, (res, error) in zip(unchanged, refetched):
+        if error or res.status_code != 200:
+            print(f"Failed to fetch data from {uri}: {error or res.status_code}")
+            return {}, None
+        pages[uri] = res.text
+    return pages, 200
+
+def parse_houses(html):
+    """Listings on a page as {'id', 'title', 'href'}, read from the h5.title.sign titles"""
+    soup = make_soup(html, only=HOUSE_TITLES)
+    houses = []
+    for h in soup.find_all('h5', attrs={'class': 'title sign'}):
+        # h is an h5 tag, usually contains an 'a' tag
+        link = h.find('a')
+        href = link.get('href', '') if link else ''
+        if href.startswith('//'):
+            href = 'https:' + href
+        title = (link or h).get_text(strip=True)
+        houses.append({'id': listing_id(href) or href or title, 'title': title, 'href': href})
+    return houses
+
+def listing_id(href):
+    """Numeric listing ID from a title link, e.g. //www.ziroom.com/x/807442510.html"""
+    match = re.search(r'/(\d+)\.html', href)
+    return match.group(1) if match else None
+
+def load_index():
     try:
-        res = requests.get(uri, headers=headers)
-        if res.status_code != 200:
-            print(f"Failed to fetch data: {res.status_code}")
-            return res, []
-            
-        soup = BeautifulSoup(res.text, 'html.parser')
-        # Find all h5 with class 'title sign'
-        houses = soup.find_all('h5', attrs={'class': 'title sign'})
-        
-        # Filter by keyword if provided
-        if keyword:
-            filtered_houses = [h for h in houses if h.string and keyword in h.string]
-            return res, filtered_houses
-        else:
-            return res, houses
-            
-    except Exception as e:
-        print(f"Error querying ziroom: {e}")
-        return None, []
-
-def generate_html(houses, uri):
-    timestamp = datetime.now().isoformat()
+        if os.path.exists(INDEX_PATH):
+            with open(INDEX_PATH, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable listing index: {e}")
+    return {}
+
+def save_index(index):
+    atomic_write(INDEX_PATH, json.dumps(index, ensure_ascii=False, separators=(',', ':')))
+
+def update_index(index, crawled):
+    """
+    Fold this run's listings into the index. Returns (added, removed, changed): the
+    set of new listing IDs, the {id: entry} listings that dropped out of every
+    search, and whether anything but last_seen changed (a title, a search, a page).
+
+    When a crawl stopped early, only listings last seen on the pages it covered
+    can be judged: those on earlier pages, plus those on the stop page itself
+    when nothing new pushed listings further down.
+    """
+    now = datetime.now().isoformat(timespec='seconds')
+    before = set(index)
+    changed = False
+    for uri, (houses, stop_page) in crawled.items():
+        current = {h['id'] for h in houses}
+        pushed_down = any(h['id'] not in before for h in houses)
+        for listing_key, entry in index.items():
+            if uri not in entry['uris'] or listing_key in current:
+                continue
+            page = entry['pages'].get(uri, 1)
+            if stop_page is None or page < stop_page or (page == stop_page and not pushed_down):
+                entry['uris'].remove(uri)
+                entry['pages'].pop(uri, None)
+                changed = True
+        for house in houses:
+            entry = index.setdefault(house['id'], {'first_seen': now, 'uris': [], 'pages': {}})
+            if (entry.get('title'), entry.get('href'), entry['pages'].get(uri)) != (house['title'], house['href'], house['page']):
+                changed = True
+            entry.update(title=house['title'], href=house['href'], last_seen=now)
+            entry['pages'][uri] = house['page']
+            if uri not in entry['uris']:
+                entry['uris'].append(uri)
+                changed = True
     
-    html_content = f"""
-    <!DOCTYPE html>
-    <html lang="zh-CN">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Ziroom Monitor Result</title>
-        <style>
-            body {{ font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif; margin: 0; background: #f5f7fa; color: #333; }}
-            .container {{ max-width: 1000px; margin: 0 auto; padding: 20px; }}
-            .header {{ background: #2c3e50; color: white; padding: 20px; border-radius: 8px 8px 0 0; display: flex; justify-content: space-between; align-items: center; }}
-            .header h1 {{ margin: 0; font-size: 1.5em; }}
-            .header a {{ color: white; text-decoration: none; background: rgba(255,255,255,0.2); padding: 5px 10px; border-radius: 4px; font-size: 0.9em; }}
-            
-            .summary {{ background-color: white; padding: 20px; border-radius: 0 0 8px 8px; margin-bottom: 20px; box-shadow: 0 1px 3px rgba(0,0,0,0.1); }}
-            .timestamp {{ color: #666; font-size: 14px; margin-bottom: 10px; }}
-            
-            .house-list {{ list-style: none; padding: 0; }}
-            .house-item {{ background: white; margin-bottom: 10px; padding: 15px; border-radius: 8px; box-shadow: 0 1px 3px rgba(0,0,0,0.05); transition: transform 0.2s; }}
-            .house-item:hover {{ transform: translateY(-2px); box-shadow: 0 4px 6px rgba(0,0,0,0.1); }}
-            .house-item a {{ text-decoration: none; color: #2c3e50; font-weight: bold; font-size: 1.1em; display: block; }}
-            .house-item a:hover {{ color: #3498db; }}
-            
-            .empty-state {{ text-align: center; padding: 40px; color: #7f8c8d; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>Ziroom 房源监控</h1>
-                <a href="../../index.html">🏠 返回首页</a>
-            </div>
-            
-            <div class="summary">
-                <div class="timestamp">更新时间: {timestamp}</div>
-                <div>
-                    <strong>监控链接:</strong> <a href="{uri}" target="_blank" style="color:#3498db; text-decoration:none;">{uri}</a><br>
-                    <strong>找到房源:</strong> {len(houses)} 套
-                </div>
-            </div>
-            
-            {generate_list(houses)}
-            
-        </div>
-    </body>
-    </html>
+    removed = {k: index.pop(k) for k in [k for k, e in index.items() if not e['uris']]}
+    return set(index) - before, removed, changed
+
+def page_url(uri, page):
     """
-    return html_content
+    URL of result page `page`. A '{page}' placeholder in the URI wins; otherwise
+    Ziroom's path style is used: /z/ -> /z/p2/, /z/d23008614/ -> /z/d23008614-p2/
+    """
+    if '{page}' in uri:
+        return uri.replace('{page}', str(page))
+    if page == 1:
+        return uri
+    parts = urlsplit(uri)
+    path = re.sub(r'([-/])p\d+$', r'\1', parts.path.rstrip('/')).rstrip('/-')
+    path += f'/p{page}' if path.endswith('/z') else f'-p{page}'
+    return urlunsplit(parts._replace(path=path + '/'))
+
+def crawl(uri, first_page, seen):
+    """
+    Listings of a search across pages, returned as (houses, stop_page). Pages are
+    fetched PREFETCH_PAGES at a time; the crawl stops at the first page holding
+    only listings seen by the previous run or after MAX_PAGES (stop_page is that
+    page), or at an empty or missing page (stop_page is None: crawled to the end).
+    A page that fails to load also stops the crawl, at the page before it, so
+    listings last seen on the failed page are not judged.
+    """
+    houses, ids = [], set()
+    
+    def add_page(page_houses, page):
+        fresh = False
+        for house in page_houses:
+            if house['id'] in ids:
+                continue
+            ids.add(house['id'])
+            house['page'] = page
+            houses.append(house)
+            fresh = fresh or house['id'] not in seen
+        return fresh
+    
+    page_houses = parse_houses(first_page)
+    if not page_houses:
+        return houses, None
+    if not add_page(page_houses, 1):
+        return houses, 1
+    
+    page = 2
+    while page <= MAX_PAGES:
+        window = list(range(page, min(page + PREFETCH_PAGES, MAX_PAGES + 1)))
+        responses = http.fetch_all([page_url(uri, n) for n in window], headers=HEADERS)
+        for n, (res, error) in zip(window, responses):
+            if not error and res.status_code == 404:
+                return houses, None
+            if error or not res.ok:
+                print(f"Failed to fetch page {n} of {uri}: {error or res.status_code}, stopping")
+                return houses, n - 1
+            page_houses = parse_houses(res.text)
+            if not page_houses:
+                return houses, None
+            if not add_page(page_houses, n):
+                print(f"Page {n} of {uri} only has known listings, stopping")
+                return houses, n
+        page += PREFETCH_PAGES
+    return houses, MAX_PAGES
+
+def match_watches(watches, index, added):
+    """
+    Match every indexed listing of a search against the keywords of all watches
+    on it in a single pass. Returns one result per watch.
+    """
+    results = [{'uri': w['uri'], 'keywords': w['keywords'], 'houses': []} for w in watches]
+    by_uri = {}
+    for result in results:
+        by_uri.setdefault(result['uri'], []).append(result)
+    
+    for uri, uri_results in by_uri.items():
+        matcher = KeywordMatcher({k for r in uri_results for k in r['keywords']})
+        for listing_key, entry in index.items():
+            if uri not in entry['uris']:
+                continue
+            house = dict(entry, id=listing_key, is_new=listing_key in added)
+            found = matcher.find(house['title'])
+            for result in uri_results:
+                if not result['keywords'] or found.intersection(result['keywords']):
+                    result['houses'].append(house)
+    return results
+
+REPORT_PAGE = Template("""<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>Ziroom Monitor Result</title>
+$stylesheet
+</head>
+<body>
+<div class="container">
+<div class="header">
+<h1>Ziroom 房源监控</h1>
+<a class="home" href="../../index.html">🏠 返回首页</a>
+</div>
+<div class="summary">
+<div class="timestamp">更新时间: $timestamp</div>
+<div>
+<strong>监控数量:</strong> $watches 个<br>
+<strong>找到房源:</strong> $total 套<br>
+<strong>本次变化:</strong> 新增 $added 套, 下架 $removed 套
+</div>
+</div>
+""")
+
+WATCH = Template("""<div class="watch">
+<strong>监控链接:</strong> <a href="$uri" target="_blank">$uri</a><br>
+<strong>关键词:</strong> $keywords<br>
+<strong>找到房源:</strong> $count 套
+</div>
+""")
+
+HOUSE_LINK = Template('<li class="house-item"><a href="$href" target="_blank">$title$new_badge</a></li>\n')
+HOUSE = Template('<li class="house-item">$title$new_badge</li>\n')
+
+REPORT_END = """</div>
+</body>
+</html>
+"""
+
+def generate_html(results, added, removed):
+    """Report chunks: summary, one list per watch, then removed listings"""
+    yield REPORT_PAGE.render(
+        stylesheet=stylesheet_link(),
+        timestamp=datetime.now().isoformat(),
+        watches=len(results),
+        total=sum(len(r['houses']) for r in results),
+        added=len(added),
+        removed=len(removed),
+    )
+    for result in results:
+        yield from generate_watch(result)
+    yield from generate_removed(removed)
+    yield REPORT_END
+
+def generate_watch(result):
+    yield WATCH.render(uri=result['uri'], keywords=', '.join(result['keywords']) or '全部', count=len(result['houses']))
+    yield from generate_list(result['houses'])
+
+def generate_removed(removed):
+    if not removed:
+        return
+    yield f'<div class="watch"><strong>已下架房源:</strong> {len(removed)} 套</div>\n<ul class="house-list removed">\n'
+    yield from HOUSE.render_all({'title': e['title'], 'new_badge': ''} for e in removed.values())
+    yield '</ul>\n'
 
 def generate_list(houses):
     if not houses:
-        return '<div class="empty-state">没有找到符合条件的房源</div>'
-        
-    items = []
+        yield '<div class="empty-state">没有找到符合条件的房源</div>\n'
+        return
+    
+    yield '<ul class="house-list">\n'
     for h in houses:
-        # Extract link and text
-        # h is an h5 tag, usually contains an 'a' tag
-        link = h.find('a')
-        if link:
-            href = link.get('href', '#')
-            if href.startswith('//'):
-                href = 'https:' + href
-            text = link.get_text(strip=True)
-            items.append(f'<li class="house-item"><a href="{href}" target="_blank">{text}</a></li>')
-        else:
-            items.append(f'<li class="house-item">{h.get_text(strip=True)}</li>')
-            
-    return f'<ul class="house-list">{"".join(items)}</ul>'
+        new_badge = '<span class="new-badge">NEW</span>' if h.get('is_new') else ''
+        template = HOUSE_LINK if h['href'] else HOUSE
+        yield template.render(href=h['href'], title=h['title'], new_badge=new_badge)
+    yield '</ul>\n'
 
 if __name__ == "__main__":
-    uri = os.environ.get('URI')
-    keyword = os.environ.get('KEYWORD')
+    watches = load_watches()
+    if not watches:
+        print("URI environment variable not set")
+        sys.exit(0)
     
-    res, houses = query(uri, keyword)
+    uris = list(dict.fromkeys(w['uri'] for w in watches))
+    pages, status = fetch_pages(uris)
     
-    if res and res.status_code == 200:
-        html = generate_html(houses, uri)
-        with open('modules/ziroom/data.html', 'w', encoding='utf-8') as f:
-            f.write(html)
-        print(f"Successfully generated data.html with {len(houses)} items")
+    if status == 304:
+        print("Skipped report generation, nothing changed")
+    elif status == 200:
+        index = load_index()
+        seen = set(index)
+        with ThreadPoolExecutor(max_workers=http.DEFAULT_WORKERS) as executor:
+            crawled = dict(zip(uris, executor.map(lambda uri: crawl(uri, pages[uri], seen), uris)))
+        added, removed, changed = update_index(index, crawled)
+        # A bare last_seen bump is not saved: it would change index.json, and so
+        # publish it, on every run
+        if changed:
+            save_index(index)
+        HTTP_CACHE.save()
+        print(f"Listing changes: {len(added)} added, {len(removed)} removed")
+        
+        if added or removed or not os.path.exists('modules/ziroom/data.html'):
+            results = match_watches(watches, index, added)
+            write_html('modules/ziroom/data.html', generate_html(results, added, removed))
+            write_mail_copy('modules/ziroom/data.html', 'modules/ziroom/mail.html')
+            print(f"Successfully generated data.html with {sum(len(r['houses']) for r in results)} items")
+        else:
+            print("No listing changes, skipped report generation")
     else:
         print("Failed to generate report")